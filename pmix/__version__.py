@@ -1,3 +1,3 @@
 """Semantic versioning for the package pmix."""
-VERSION = (0, 4, 0)
+VERSION = (0, 5, 0)
 __version__ = '.'.join(map(str, VERSION))
@@ -47,10 +47,11 @@ def get_filtered_survey_names(xlsform):
     Returns:
         A list of ODK names to use in analytics.
     """
-    odk_type = xlsform['survey'].column('type')
-    odk_name = xlsform['survey'].column('name')
-    filtered = [str(n) for t, n in zip(odk_type, odk_name) if
-                is_analytics_type(str(t))]
+    survey = xlsform['survey']
+    name_col = survey.column_key('name')[0]
+    rows = sorted(i for odk_type, type_rows in survey.row_index('type').items()
+                  if is_analytics_type(odk_type) for i in type_rows)
+    filtered = [str(survey[i][name_col]) for i in rows]
     return filtered
 
 
@@ -89,14 +90,24 @@ def get_useful_tags(xlsform):
         'FRS_result',
         'SDP_result'
     )
-    odk_name = set(str(c) for c in xlsform['survey'].column('name'))
+    odk_name = xlsform['survey'].row_index('name')
     keepers = [t for t in useful_tags if t in odk_name]
     return keepers
 
 
-def analytics_obj(xlsxfile):
-    """Create an analytics object based on supplied path."""
-    xls = Xlsform(xlsxfile)
+def analytics_obj(xlsxfile, cache=False):
+    """Create an analytics object based on supplied path.
+
+    Args:
+        xlsxfile (str): The path to the XLSForm
+        cache (bool): Use the on-disk cache of parsed files?
+    """
+    xls = Xlsform(xlsxfile, lazy=True, cache=cache)
+    return xlsform_analytics_obj(xls)
+
+
+def xlsform_analytics_obj(xls):
+    """Create an analytics object based on a loaded Xlsform."""
     form_id = xls.form_id
     form_title = xls.form_title
     prompts = get_filtered_survey_names(xls)
@@ -113,9 +124,25 @@ def analytics_obj(xlsxfile):
     return obj
 
 
-def get_analytics_objs(xlsxfiles):
-    """Get the list of analytics objects based on supplied paths."""
-    return [analytics_obj(xlsxfile) for xlsxfile in set(xlsxfiles)]
+def get_analytics_objs(xlsxfiles, cache=False, workers=1):
+    """Get the list of analytics objects based on supplied paths.
+
+    Args:
+        xlsxfiles (list of str): Paths to XLSForms. Duplicates are skipped.
+        cache (bool): Use the on-disk cache of parsed files?
+        workers (int): The number of processes used to parse files. None
+            means one per processor.
+
+    Raises:
+        The first error found while parsing the files.
+    """
+    paths = list(dict.fromkeys(xlsxfiles))
+    objs = []
+    for result in Xlsform.iter_load(paths, workers, lazy=True, cache=cache):
+        if result.error is not None:
+            raise result.error
+        objs.append(xlsform_analytics_obj(result.workbook))
+    return objs
 
 
 def prettify(obj):
@@ -135,9 +162,17 @@ def analytics_cli():
                 'result is sent to standard out.')
     parser.add_argument('-o', '--outpath', help=out_help)
 
+    cache_help = 'Reuse parsed files from the on-disk cache (~/.cache/pmix).'
+    parser.add_argument('--cache', action='store_true', help=cache_help)
+
+    workers_help = ('The number of processes used to parse files. Defaults '
+                    'to 1.')
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help=workers_help)
+
     args = parser.parse_args()
 
-    objs = get_analytics_objs(args.xlsxfile)
+    objs = get_analytics_objs(args.xlsxfile, args.cache, args.workers)
     result = prettify(objs)
     if args.outpath:
         with open(args.outpath, mode='w', encoding='utf-8') as out:
@@ -27,32 +27,38 @@ import argparse
 import pathlib
 from typing import List, Set
 
+from pmix.utils import excel_outpath
 from pmix.verbiage import TranslationDict
 from pmix.xlsform import Xlsform
 
 
-def create_translation_dict(xlsxfile: List[str], correct: List[str]) \
+def create_translation_dict(xlsxfile: List[str], correct: List[str],
+                            cache: bool = False, workers: int = 1) \
         -> TranslationDict:
     """Create a translation dict from source Excel files.
 
     Args:
         xlsxfile: Paths to Excel files
         correct: Paths to Excel files that should be marked correct
+        cache: Use the on-disk cache of parsed files?
+        workers: The number of processes used to parse files. None means
+            one per processor.
+
+    Raises:
+        The first error found while parsing the files.
     """
     translation_dict = TranslationDict()
-    extracted = set()
-    for path in correct:
-        if path in extracted:
-            continue
-        xlsform = Xlsform(path)
-        translation_dict.extract_translations(xlsform, correct=True)
-        extracted.add(path)
-    for path in xlsxfile:
-        if path in extracted:
-            continue
-        xlsform = Xlsform(path)
-        translation_dict.extract_translations(xlsform)
-        extracted.add(path)
+    correct_set = set(correct)
+    # Correct files first, keeping order and skipping duplicates
+    paths = list(dict.fromkeys(list(correct) + list(xlsxfile)))
+    # Text is interned in this process, also for forms read by workers, so
+    # it is shared by the forms and the translation dictionary
+    for result in Xlsform.iter_load(paths, workers, cache=cache, intern=True):
+        if result.error is not None:
+            raise result.error
+        is_correct = result.path in correct_set
+        translation_dict.extract_translations(result.workbook,
+                                              correct=is_correct)
     return translation_dict
 
 
@@ -135,8 +141,8 @@ def get_merged_file_paths(merge: List[str], outfile: str, outdir: str,
             result_directory.mkdir(parents=True, exist_ok=True)
     default_suffix = '-borrow'
     for merge_file in merge:
-        this_merge = pathlib.Path(merge_file)
-        merge_result = this_merge.stem + default_suffix + this_merge.suffix
+        merge_result = pathlib.Path(excel_outpath(merge_file,
+                                                  default_suffix)).name
         full_merge_result = result_directory / merge_result
         file_paths.append(str(full_merge_result))
     return file_paths
@@ -145,7 +151,8 @@ def get_merged_file_paths(merge: List[str], outfile: str, outdir: str,
 # pylint: disable=too-many-arguments
 def merge_translation_file(merge: List[str], translation_dict: TranslationDict,
                            outfile: List[str], add: List[str],
-                           ignore: Set[str], carry: bool, no_diverse: bool):
+                           ignore: Set[str], carry: bool, no_diverse: bool,
+                           cache: bool = False):
     """Merge in translations to designated ODK files.
 
     Args:
@@ -158,13 +165,14 @@ def merge_translation_file(merge: List[str], translation_dict: TranslationDict,
         carry: If true, carry text from the source language to the translations
         no_diverse: If true, do not insert a translation that has various
             choices
+        cache: Use the on-disk cache of parsed files?
     """
     for merge_source, merge_destination in zip(merge, outfile):
-        xlsform = Xlsform(merge_source)
+        xlsform = Xlsform(merge_source, cache=cache)
         xlsform.add_languages(add)
         xlsform.merge_translations(translation_dict, ignore, carry=carry,
                                    no_diverse=no_diverse)
-        xlsform.write_out(merge_destination)
+        xlsform.write_out(merge_destination, constant_memory=True)
         print('Merged translations into file: "{}"'.format(merge_destination))
 
 
@@ -238,6 +246,15 @@ def borrow_cli():
               'for filenames. If neither outfile nor outdir are supplied, '
               'then default filenames are used in the current directory.')
     )
+    parser.add_argument(
+        '--cache', action='store_true',
+        help='Reuse parsed files from the on-disk cache (~/.cache/pmix).'
+    )
+    parser.add_argument(
+        '-w', '--workers', type=int, default=1,
+        help=('The number of processes used to parse source XLSForms. '
+              'Defaults to 1.')
+    )
 
     args = parser.parse_args()
     print(args)
@@ -253,6 +270,8 @@ def borrow_cli():
         carry=args.carry,
         outfile=args.outfile,
         outdir=args.outdir,
+        cache=args.cache,
+        workers=args.workers,
     )
 
 
@@ -260,7 +279,8 @@ def borrow_cli():
 def borrow(*, xlsxfiles: List[str], correct: List[str], merge: List[str],
            merge_all: List[str], add: List[str], ignore: List[str],
            no_diverse: bool = False, diverse: str = None, carry: bool = False,
-           outfile: str = None, outdir: str = None):
+           outfile: str = None, outdir: str = None, cache: bool = False,
+           workers: int = 1):
     """Borrow files with this Python routine.
 
     This method exists so that non-CLI users can run borrow. See CLI help
@@ -279,10 +299,13 @@ def borrow(*, xlsxfiles: List[str], correct: List[str], merge: List[str],
             exists
         outfile: Filename where to write the result
         outdir: Directory where to write the result
+        cache: Use the on-disk cache of parsed files
+        workers: The number of processes used to parse source files
     """
     source_files = xlsxfiles
     correct_files = correct if correct else []
-    translation_dict = create_translation_dict(source_files, correct_files)
+    translation_dict = create_translation_dict(source_files, correct_files,
+                                               cache, workers)
     to_add = sorted(list(set(add))) if add else []
     if not merge and not merge_all:
         outfile = get_translation_file_path(outfile=outfile, outdir=outdir,
@@ -298,7 +321,7 @@ def borrow(*, xlsxfiles: List[str], correct: List[str], merge: List[str],
         outfiles = get_merged_file_paths(merge=combined_merge, outfile=outfile,
                                          outdir=outdir, create_parents=True)
         merge_translation_file(combined_merge, translation_dict, outfiles,
-                               to_add, ignored, carry, no_diverse)
+                               to_add, ignored, carry, no_diverse, cache)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,207 @@
+"""Module defining an on-disk cache of parsed workbooks."""
+import hashlib
+import os
+import os.path
+import pickle
+import tempfile
+
+
+class WorkbookCache:
+    """Cache for the converted cell values of spreadsheet files.
+
+    Entries are keyed by the absolute path, size, modification time and a
+    hash of the contents of the source file, together with the options used
+    to convert it. The values of every sheet are stored with pickle, which is
+    much faster to read back than parsing the spreadsheet again. When the
+    total size of the cache grows past `max_size`, the least recently used
+    entries are removed.
+
+    Only files written by this class should be kept in the cache directory,
+    since they are unpickled when read.
+
+    Class attributes:
+        VERSION (int): The version of the stored format. Entries of another
+            version are not used.
+        SUFFIX (str): The extension of the cache entry files.
+        DEFAULT_MAX_SIZE (int): The default size limit in bytes.
+
+    Instance attributes:
+        directory (str): The directory where entries are stored
+        max_size (int): The size limit of the cache in bytes
+    """
+
+    VERSION = 1
+    SUFFIX = '.pmix-cache'
+    DEFAULT_MAX_SIZE = 512 * 1024 * 1024
+
+    def __init__(self, directory=None, max_size=DEFAULT_MAX_SIZE):
+        """Initialize the cache.
+
+        Args:
+            directory (str): Where to store the entries. Defaults to "pmix"
+                in $XDG_CACHE_HOME, or in ~/.cache if that is not set. The
+                directory is created if needed.
+            max_size (int): The size limit of the cache in bytes
+        """
+        if directory is None:
+            directory = self.default_directory()
+        self.directory = directory
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def default_directory():
+        """Return the default cache directory."""
+        base = os.environ.get('XDG_CACHE_HOME')
+        if not base:
+            base = os.path.join(os.path.expanduser('~'), '.cache')
+        return os.path.join(base, 'pmix')
+
+    @staticmethod
+    def fingerprint(path, **options):
+        """Compute the cache key for a file.
+
+        Args:
+            path (str): The path to the source file, or to a directory of
+                source files
+            **options: The conversion options that affect the cached data
+
+        Returns:
+            A hex string identifying the file contents and options.
+        """
+        if os.path.isdir(path):
+            files = sorted(os.path.join(path, name) for name in
+                           os.listdir(path))
+            files = [file for file in files if os.path.isfile(file)]
+        else:
+            files = [path]
+        stats = []
+        content_hash = hashlib.sha256()
+        for file_path in files:
+            stat = os.stat(file_path)
+            stats.append((os.path.basename(file_path), stat.st_size,
+                          stat.st_mtime_ns))
+            content_hash.update(file_path.encode('utf-8'))
+            with open(file_path, 'rb') as file:
+                chunk = file.read(1 << 20)
+                while chunk:
+                    content_hash.update(chunk)
+                    chunk = file.read(1 << 20)
+        key = (os.path.abspath(path), stats, content_hash.hexdigest(),
+               sorted(options.items()))
+        return hashlib.sha256(repr(key).encode('utf-8')).hexdigest()
+
+    def entry_path(self, key):
+        """Return the path of the cache entry for a key."""
+        return os.path.join(self.directory, key + self.SUFFIX)
+
+    def get(self, path, **options):
+        """Get the cached sheets for a file.
+
+        Args:
+            path (str): The path to the source file
+            **options: The conversion options that affect the cached data
+
+        Returns:
+            A list of (name, rows) tuples, where rows is a list of lists of
+            cell values, or None if the file is not in the cache.
+        """
+        return self.get_entry(self.fingerprint(path, **options))
+
+    def get_entry(self, key):
+        """Get the cached sheets for a key from `fingerprint`.
+
+        An entry that cannot be read back, e.g. because it is corrupt or
+        was written by another version of the code, is removed and counts
+        as a miss.
+
+        Args:
+            key (str): The cache key
+
+        Returns:
+            A list of (name, rows) tuples, or None if there is no usable
+            entry for the key.
+        """
+        entry = self.entry_path(key)
+        try:
+            with open(entry, 'rb') as file:
+                version, sheets = pickle.load(file)
+        except FileNotFoundError:
+            return None
+        # pylint: disable=broad-except
+        except Exception:
+            self.remove(entry)
+            return None
+        if version != self.VERSION:
+            return None
+        # Mark as recently used
+        os.utime(entry)
+        return sheets
+
+    def put(self, path, sheets, **options):
+        """Store the sheets of a file in the cache.
+
+        Args:
+            path (str): The path to the source file
+            sheets (list): A list of (name, rows) tuples, where rows is a list
+                of lists of cell values.
+            **options: The conversion options that affect the cached data
+        """
+        self.put_entry(self.fingerprint(path, **options), sheets)
+
+    def put_entry(self, key, sheets):
+        """Store sheets in the cache under a key from `fingerprint`.
+
+        Args:
+            key (str): The cache key
+            sheets (list): A list of (name, rows) tuples, where rows is a list
+                of lists of cell values.
+        """
+        entry = self.entry_path(key)
+        handle, tmp_path = tempfile.mkstemp(dir=self.directory)
+        try:
+            with os.fdopen(handle, 'wb') as file:
+                pickle.dump((self.VERSION, sheets), file,
+                            protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, entry)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def entries(self):
+        """Return (mtime, size, path) of all entries, oldest first."""
+        result = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.SUFFIX):
+                continue
+            entry = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(entry)
+            except OSError:
+                continue
+            result.append((stat.st_mtime_ns, stat.st_size, entry))
+        return sorted(result)
+
+    def evict(self):
+        """Remove least recently used entries until under the size limit."""
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in entries:
+            if total <= self.max_size:
+                break
+            self.remove(entry)
+            total -= size
+
+    @staticmethod
+    def remove(entry):
+        """Remove an entry file, if it still exists."""
+        try:
+            os.remove(entry)
+        except OSError:
+            pass
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        for _, _, entry in self.entries():
+            os.remove(entry)
@@ -16,13 +16,13 @@ Extra columns do not matter. Identifer should be a able to become a list_name
 name and label are optional, but at least one must exist
 """
 
-import os.path
 import argparse
 
 import xlsxwriter
 
 from pmix.workbook import Workbook
 from pmix.error import CascadeError
+from pmix.utils import excel_outpath
 
 
 class Cascade:
@@ -55,7 +55,7 @@ class Cascade:
         """
         self.data = Cascade.Node(name=None, label=None, identifier=None)
         self.file = path
-        wb = Workbook(self.file)
+        wb = Workbook(self.file, lazy=True)
         if sheet is None:
             ws = wb[0]
         else:
@@ -71,7 +71,7 @@ class Cascade:
             raise CascadeError()
         self.has_name, self.has_label = list(vals)[0]
 
-        for row in ws[1:]:
+        for row in ws.body():
             self.add_row_to_tree(row)
 
         self.rename_data()
@@ -337,12 +337,10 @@ def cascade_cli():
 
     args = parser.parse_args()
 
-    base, file = os.path.split(args.xlsxfile)
-    name, ext = os.path.splitext(file)
     if args.outpath is not None:
         outpath = args.outpath
     else:
-        outpath = os.path.join(base, name) + "-cascade" + ext
+        outpath = excel_outpath(args.xlsxfile, '-cascade')
 
     cascade = Cascade(args.xlsxfile, args.sheet)
     cascade.write_out(outpath)
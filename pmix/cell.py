@@ -1,5 +1,7 @@
 """Module for Cell class."""
 import datetime
+import itertools
+
 import xlrd
 
 
@@ -27,6 +29,16 @@ class CellError:
         """
         return ''
 
+    def __eq__(self, other):
+        """Compare errors by their Excel internal value."""
+        if isinstance(other, CellError):
+            return self.value == other.value
+        return NotImplemented
+
+    def __hash__(self):
+        """Hash consistently with equality."""
+        return hash((CellError, self.value))
+
     def __repr__(self):
         """Get a representation of this object."""
         return f'CellError({self.value})'
@@ -41,6 +53,8 @@ class Cell:
         highlight (str): The highlight color for this cell.
     """
 
+    __slots__ = ('value', 'highlight')
+
     def __init__(self, value=None):
         """Initialize cell to have value as Python object.
 
@@ -114,9 +128,12 @@ class Cell:
             stripstr (bool): Remove trailing / leading whitespace from text?
 
         Returns:
-            An intialized cell object.
+            An intialized cell object. Blank cells are the shared read-only
+            BLANK cell.
         """
         cell_value = cls.cell_value(cell, datemode, stripstr)
+        if cell_value is None:
+            return BLANK
         return cls(cell_value)
 
     @staticmethod
@@ -149,20 +166,82 @@ class Cell:
         elif cell.ctype == xlrd.XL_CELL_DATE:
             value = Cell.parse_datetime(cell.value, datemode)
         elif cell.ctype == xlrd.XL_CELL_ERROR:
-<<<<<<< HEAD
-            msg = 'Error cell found. Likely to be one of'\
-                  ' the following: #N/A, #NULL!, #DIV/0!, #VALUE!, #REF!, ' \
-                  '#NAME?, #NUM!, #GETTING_DATA'
-            raise TypeError(msg)
-=======
             value = CellError(cell.value)
->>>>>>> trunk/master
         else:
             msg = 'Unhandled cell found!\nType: {}\nValue: {}'
             msg = msg.format(cell.ctype, cell.value)
             raise TypeError(msg)
         return value
 
+    @classmethod
+    def convert_values(cls, types, values, datemode=None, stripstr=True):
+        """Get python objects out of a row of xlrd cell types and values.
+
+        This gives the same result as `cell_value` on each cell, but
+        dispatches on the cell type once per run of cells with the same
+        type instead of once per cell. Rows with only text or only empty
+        cells, common in XLSForms, are converted in one step.
+
+        Args:
+            types (sequence): The xlrd cell types, e.g. `Sheet.row_types`
+            values (sequence): The xlrd cell values, e.g. `Sheet.row_values`
+            datemode (int): The date mode for the workbook
+            stripstr (bool): Remove trailing / leading whitespace from text?
+
+        Returns:
+            list: The python objects represented by the cells.
+        """
+        count = len(types)
+        if types.count(xlrd.XL_CELL_TEXT) == count:
+            return cls.convert_run(xlrd.XL_CELL_TEXT, values, datemode,
+                                   stripstr)
+        if types.count(xlrd.XL_CELL_EMPTY) == count:
+            return [None] * count
+        result = []
+        start = 0
+        for ctype, run in itertools.groupby(types):
+            stop = start + sum(1 for _ in run)
+            result.extend(cls.convert_run(ctype, values[start:stop],
+                                          datemode, stripstr))
+            start = stop
+        return result
+
+    @staticmethod
+    def convert_run(ctype, values, datemode=None, stripstr=True):
+        """Get python objects out of xlrd cell values that share a type.
+
+        Args:
+            ctype (int): The xlrd cell type of all the values
+            values (sequence): The xlrd cell values
+            datemode (int): The date mode for the workbook
+            stripstr (bool): Remove trailing / leading whitespace from text?
+
+        Returns:
+            list: The python objects represented by the cells.
+        """
+        if ctype == xlrd.XL_CELL_TEXT:
+            if stripstr:
+                return [value.strip() for value in values]
+            return list(values)
+        if ctype == xlrd.XL_CELL_EMPTY:
+            return [None] * len(values)
+        if ctype == xlrd.XL_CELL_NUMBER:
+            # Make integer what is equal to an integer
+            result = []
+            for value in values:
+                int_val = int(value)
+                result.append(int_val if int_val == value else value)
+            return result
+        if ctype == xlrd.XL_CELL_BOOLEAN:
+            return [value == 1 for value in values]
+        if ctype == xlrd.XL_CELL_DATE:
+            return [Cell.parse_datetime(value, datemode) for value in values]
+        if ctype == xlrd.XL_CELL_ERROR:
+            return [CellError(value) for value in values]
+        msg = 'Unhandled cell found!\nType: {}\nValue: {}'
+        msg = msg.format(ctype, values[0])
+        raise TypeError(msg)
+
     @staticmethod
     def parse_datetime(value, datemode):
         """Convert an xlrd cell value to a date time object.
@@ -184,3 +263,46 @@ class Cell:
         else:
             value = datetime.datetime(*date_tuple)
         return value
+
+
+class BlankCell(Cell):
+    """A read-only blank cell.
+
+    Worksheets store the single instance BLANK at every blank position
+    instead of a Cell of their own. Writing to it raises an AttributeError;
+    use `Worksheet.writable_cell` to get a cell that can be written to or
+    highlighted.
+    """
+
+    __slots__ = ()
+
+    # pylint: disable=super-init-not-called
+    def __init__(self):
+        """Initialize the blank cell."""
+        object.__setattr__(self, 'value', None)
+        object.__setattr__(self, 'highlight', None)
+
+    def __setattr__(self, name, value):
+        """Refuse writes, since this cell is shared."""
+        msg = ('Blank cells are shared and read-only. Use '
+               'Worksheet.writable_cell to get a cell to write to.')
+        raise AttributeError(msg)
+
+    def __copy__(self):
+        """Return the shared instance."""
+        return self
+
+    def __deepcopy__(self, memo):
+        """Return the shared instance."""
+        return self
+
+    def __reduce__(self):
+        """Pickle as a reference to the shared instance."""
+        return 'BLANK'
+
+    def __repr__(self):
+        """Return a representation of the cell."""
+        return '<BlankCell>'
+
+
+BLANK = BlankCell()
@@ -0,0 +1,257 @@
+"""Module for ColumnStore, a column-major backend for Worksheet data."""
+from pmix.cell import Cell
+
+
+class ColumnCell(Cell):
+    """A Cell that reads and writes through to a position in a ColumnStore.
+
+    A ColumnCell is created on demand and holds no value of its own. It
+    refers to a row and column index, so it should not be kept across
+    insertions of rows into the store.
+
+    Instance attributes:
+        store (ColumnStore): The store holding the value and highlight
+        row (int): The row index in the store
+        col (int): The column index in the store
+    """
+
+    __slots__ = ('store', 'row', 'col')
+
+    # pylint: disable=super-init-not-called
+    def __init__(self, store, row, col):
+        """Initialize the cell as a reference into a store.
+
+        Args:
+            store (ColumnStore): The store holding the value and highlight
+            row (int): The row index in the store
+            col (int): The column index in the store
+        """
+        self.store = store
+        self.row = row
+        self.col = col
+
+    @property
+    def value(self):
+        """Get the value stored at this position."""
+        return self.store.columns[self.col][self.row]
+
+    @value.setter
+    def value(self, value):
+        """Set the value stored at this position."""
+        self.store.columns[self.col][self.row] = value
+
+    @property
+    def highlight(self):
+        """Get the highlight stored at this position."""
+        return self.store.highlights.get((self.row, self.col))
+
+    @highlight.setter
+    def highlight(self, color):
+        """Set the highlight stored at this position."""
+        if color is None:
+            self.store.highlights.pop((self.row, self.col), None)
+        else:
+            self.store.highlights[(self.row, self.col)] = color
+
+    def __repr__(self):
+        """Return a representation of the cell."""
+        msg = '<ColumnCell(value={!r})>'.format(self.value)
+        return msg
+
+
+class ColumnRow:
+    """A view on one row of a ColumnStore.
+
+    Indexing and iterating give ColumnCell objects, so a ColumnRow can be
+    used wherever a Worksheet row (a list of Cell) is expected.
+    """
+
+    def __init__(self, store, row):
+        """Initialize the row view.
+
+        Args:
+            store (ColumnStore): The store holding the row
+            row (int): The row index in the store
+        """
+        self.store = store
+        self.row = row
+
+    def values(self):
+        """Return a list of the values in this row."""
+        return [column[self.row] for column in self.store.columns]
+
+    def __len__(self):
+        """Return the number of columns."""
+        return len(self.store.columns)
+
+    def __getitem__(self, key):
+        """Return the cell at index key (int) or a list of cells (slice)."""
+        ncol = len(self)
+        if isinstance(key, slice):
+            return [ColumnCell(self.store, self.row, j) for j in
+                    range(*key.indices(ncol))]
+        if key < 0:
+            key += ncol
+        if not 0 <= key < ncol:
+            raise IndexError(key)
+        return ColumnCell(self.store, self.row, key)
+
+    def __iter__(self):
+        """Return an iterator on the cells of this row."""
+        for j in range(len(self)):
+            yield ColumnCell(self.store, self.row, j)
+
+    def __eq__(self, other):
+        """Compare cell by cell with another row."""
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        """Return a representation of the row."""
+        return repr(list(self))
+
+
+class ColumnStore:
+    """Column-major storage for the data of a Worksheet.
+
+    The store keeps one list of values per column and a sparse map of the
+    highlighted cells. It supports the parts of the list protocol that a
+    Worksheet uses on its rows, giving ColumnRow views, so it can be used as
+    `Worksheet.data`. Whole columns are available without touching any row.
+
+    Instance attributes:
+        columns (list): One list of cell values per column
+        highlights (dict): Maps (row, col) to the highlight color of the
+            cells that are highlighted
+        nrows (int): The number of rows
+    """
+
+    def __init__(self, columns=None, highlights=None):
+        """Initialize the store.
+
+        Args:
+            columns (list): One list of values per column. All lists should
+                have the same length.
+            highlights (dict): Maps (row, col) to a highlight color.
+        """
+        self.columns = [] if columns is None else columns
+        self.highlights = {} if highlights is None else highlights
+        self.nrows = len(self.columns[0]) if self.columns else 0
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Create a ColumnStore from rows.
+
+        Args:
+            rows (iterable): Rows where each item is either a Cell or a plain
+                value, e.g. the rows of a Worksheet or of `Worksheet.stream`.
+
+        Returns:
+            ColumnStore: An initialized store
+        """
+        store = cls()
+        for row in rows:
+            store.append(row)
+        return store
+
+    def ncol(self):
+        """Return the number of columns."""
+        return len(self.columns)
+
+    def column(self, col):
+        """Get the list of values in a column, which is not a copy."""
+        return self.columns[col]
+
+    def row_values(self, row):
+        """Return a list of the values in a row."""
+        return [column[row] for column in self.columns]
+
+    def append(self, row):
+        """Append a row to the end of the store.
+
+        Args:
+            row (sequence): A sequence of Cell or plain values
+        """
+        self.insert(self.nrows, row)
+
+    def insert(self, index, row):
+        """Insert a row into the store before the given index.
+
+        Highlights of later rows are shifted down by one.
+
+        Args:
+            index (int): The row index
+            row (sequence): A sequence of Cell or plain values
+        """
+        if not self.columns:
+            # No width yet: the first non-empty row sets it, padding the
+            # empty rows before it
+            self.columns = [[None] * self.nrows for _ in row]
+        elif len(row) != len(self.columns):
+            msg = 'Row width inconsistent with store ({} vs. {})'
+            raise ValueError(msg.format(len(row), len(self.columns)))
+        index = max(0, min(index, self.nrows))
+        if index < self.nrows and self.highlights:
+            self.highlights = {
+                (i + 1 if i >= index else i, j): color for (i, j), color in
+                self.highlights.items()
+            }
+        for j, item in enumerate(row):
+            if isinstance(item, Cell):
+                self.columns[j].insert(index, item.value)
+                if item.highlight is not None:
+                    self.highlights[(index, j)] = item.highlight
+            else:
+                self.columns[j].insert(index, item)
+        self.nrows += 1
+
+    def copy(self):
+        """Return a copy that shares no lists with this store."""
+        columns = [list(column) for column in self.columns]
+        return ColumnStore(columns, dict(self.highlights))
+
+    def append_column(self, values):
+        """Append a column of values to the store.
+
+        Args:
+            values (list): The values, one per row. The list is used as is.
+        """
+        if len(values) != self.nrows:
+            msg = 'Column length inconsistent with store ({} vs. {})'
+            raise ValueError(msg.format(len(values), self.nrows))
+        self.columns.append(values)
+
+    def __len__(self):
+        """Return the number of rows."""
+        return self.nrows
+
+    def __getitem__(self, key):
+        """Return the row view at index key (int) or a list of them (slice)."""
+        if isinstance(key, slice):
+            rows = range(*key.indices(self.nrows))
+            return [ColumnRow(self, i) for i in rows]
+        if key < 0:
+            key += self.nrows
+        if not 0 <= key < self.nrows:
+            raise IndexError(key)
+        return ColumnRow(self, key)
+
+    def __iter__(self):
+        """Return an iterator on the row views."""
+        for i in range(self.nrows):
+            yield ColumnRow(self, i)
+
+    def __eq__(self, other):
+        """Compare row by row with another store or list of rows."""
+        if isinstance(other, ColumnStore):
+            return self.columns == other.columns
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        """Return a representation of the store."""
+        return repr(list(self))
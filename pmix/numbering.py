@@ -57,7 +57,6 @@ TODO: Count up to a fixed number with '>'.
 """
 import argparse
 import copy
-import os.path
 import re
 
 from pmix import utils
@@ -423,11 +422,13 @@ def compute_prepend_numbers(inpath, col, outpath, rm_on_empty=False):
     for i, header in enumerate(survey.column_headers()):
         if header.startswith('label') or header.startswith('ppp_label'):
             header_skipped = False
-            for num, cell in zip(context.string_iter(), survey.column(i)):
+            numbered = zip(context.string_iter(), survey.column(i))
+            for row, (num, cell) in enumerate(numbered):
                 if not header_skipped:
                     header_skipped = True
                     continue
                 if num:
+                    cell = survey.writable_cell(row, i)
                     old_text = str(cell)
                     cell_num, the_rest = utils.td_split_text(old_text)
                     new_text = '. '.join((num, the_rest))
@@ -470,9 +471,8 @@ def numbering_cli():
     col = DEFAULT_NUM_COL
     if args.numbering:
         col = args.numbering
-    filename, extension = os.path.splitext(args.xlsxfile)
     if args.outpath is None:
-        outpath = os.path.join(filename+'-num'+extension)
+        outpath = utils.excel_outpath(args.xlsxfile, '-num')
     else:
         outpath = args.outpath
     compute_prepend_numbers(args.xlsxfile, col, outpath)
@@ -0,0 +1,771 @@
+"""Module defining the backends that read spreadsheet files.
+
+A reader opens one file and gives the raw cell data of its sheets as xlrd
+cell types and values. Converting them to Python objects is shared by all
+readers (see `Worksheet.convert_rows`). `Workbook` picks a reader from its
+registry by file extension, or by the engine name passed to it.
+"""
+import csv
+import itertools
+import math
+import os
+import posixpath
+import re
+import xml.etree.ElementTree as ElementTree
+import zipfile
+
+import xlrd
+
+from pmix.worksheet import Worksheet
+
+
+class Reader:
+    """Base class for readers of spreadsheet files.
+
+    Subclasses open the file in `__init__` and implement `sheet_names` and
+    `typed_rows`.
+
+    Class attributes:
+        CACHEABLE (bool): Whether converted values may be kept in a
+            WorkbookCache. Readers that are already fast, or that give more
+            than cell values, turn this off.
+
+    Instance attributes:
+        path (str): The path to the file
+        datemode (int): The date mode of the workbook
+    """
+
+    CACHEABLE = True
+
+    def __init__(self, path):
+        """Open a file.
+
+        Args:
+            path (str): The path to the file
+        """
+        self.path = path
+        self.datemode = 0
+
+    def sheet_names(self):
+        """Return a list of the sheet names, in order."""
+        raise NotImplementedError
+
+    def typed_rows(self, index):
+        """Iterate over the raw cell data of a sheet.
+
+        Args:
+            index (int): The index of the sheet
+
+        Yields:
+            A (types, values) tuple of equal length sequences for each row,
+            with xlrd cell types and values. All rows have the same length.
+        """
+        raise NotImplementedError
+
+    def rows(self, index, stripstr=True):
+        """Iterate over the converted rows of a sheet.
+
+        Args:
+            index (int): The index of the sheet
+            stripstr (bool): Remove trailing / leading whitespace from text?
+
+        Yields:
+            A list of cell values for each row of the sheet.
+        """
+        name = self.sheet_names()[index]
+        return Worksheet.convert_rows(self.typed_rows(index), name,
+                                      self.datemode, stripstr)
+
+    def head(self, index, nrows, stripstr=True):
+        """Read the first rows of a sheet.
+
+        Readers that can stop parsing a sheet early override this.
+
+        Args:
+            index (int): The index of the sheet
+            nrows (int): The number of rows to read
+            stripstr (bool): Remove trailing / leading whitespace from text?
+
+        Returns:
+            A list with a list of cell values for each row read. It is
+            shorter than nrows if the sheet is.
+        """
+        return list(itertools.islice(self.rows(index, stripstr), nrows))
+
+    def highlights(self, index):
+        """Return a dictionary from (row, col) to highlight color of a sheet.
+
+        Only readers of formats that keep highlights return any.
+        """
+        return {}
+
+    # pylint: disable=too-many-arguments
+    def worksheet(self, index, stripstr=True, columnar=False, intern=None,
+                  fail_fast=False):
+        """Build a Worksheet from a sheet.
+
+        Args:
+            index (int): The index of the sheet
+            stripstr (bool): Remove trailing / leading whitespace from text?
+            columnar (bool): Store the data in a ColumnStore?
+            intern (bool or dict): Intern text values? See
+                `Worksheet.from_rows`.
+            fail_fast (bool): Raise SpreadsheetError at the first Excel
+                error?
+
+        Returns:
+            Worksheet: The converted sheet
+        """
+        name = self.sheet_names()[index]
+        rows = self.rows(index, stripstr)
+        worksheet = Worksheet.from_rows(rows, name, columnar, intern,
+                                        fail_fast)
+        highlights = self.highlights(index)
+        if highlights:
+            # Highlights do not change values, so the error index holds
+            errors = worksheet.error_positions()
+            for (row, col), color in highlights.items():
+                worksheet.writable_cell(row, col).set_highlight(color)
+            worksheet.set_error_index(errors)
+        return worksheet
+
+    def release(self, index):
+        """Free the memory held for a sheet that has been read."""
+
+    def close(self):
+        """Free the resources held for the file."""
+
+    def __enter__(self):
+        """Enter a context that closes the reader."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the reader."""
+        self.close()
+
+
+class XlrdReader(Reader):
+    """Reader for .xls files (and .xlsx with xlrd before 2.0) using xlrd.
+
+    The workbook is opened with xlrd's on_demand option, so sheets are only
+    parsed when they are read (xlrd always parses .xlsx in full).
+    """
+
+    def __init__(self, path):
+        """Open a file with xlrd.
+
+        Args:
+            path (str): The path to the file
+        """
+        super().__init__(path)
+        with open(path, 'rb') as file:
+            contents = file.read()
+        self.book = xlrd.open_workbook(file_contents=contents, on_demand=True)
+        self.datemode = self.book.datemode
+
+    def sheet_names(self):
+        """Return a list of the sheet names, in order."""
+        return self.book.sheet_names()
+
+    def typed_rows(self, index):
+        """Iterate over the raw cell data of a sheet."""
+        sheet = self.book.sheet_by_index(index)
+        for i in range(sheet.nrows):
+            yield sheet.row_types(i), sheet.row_values(i)
+
+    def rows(self, index, stripstr=True):
+        """Iterate over the converted rows of a sheet."""
+        sheet = self.book.sheet_by_index(index)
+        return Worksheet.stream(sheet, self.datemode, stripstr)
+
+    def release(self, index):
+        """Unload a sheet from the xlrd book."""
+        if self.book.sheet_loaded(index):
+            self.book.unload_sheet(index)
+
+    def close(self):
+        """Release the xlrd book."""
+        self.book.release_resources()
+
+
+class XlsxReader(Reader):
+    """Reader for .xlsx files using only the standard library.
+
+    The file is read as a zip archive, and the XML parts are parsed
+    incrementally with ElementTree.iterparse. Shared strings are kept in a
+    list and looked up by index. Reading only the first rows of a sheet
+    parses only the shared strings they use. Each sheet is parsed only when
+    it is read, so lazy loading of .xlsx files reads nothing but the sheet
+    names.
+
+    Values are given as xlrd would give them: numbers as float, dates as
+    float with the XL_CELL_DATE type, booleans as int and errors by their
+    internal code.
+
+    Instance attributes:
+        archive (zipfile.ZipFile): The file contents
+        members (set): The names of the parts in the archive
+        ns (str): The XML namespace of the spreadsheet parts, in braces
+        names (list): The sheet names
+        parts (list): The archive part of each sheet
+        date_styles (set): The indices of cell styles with a date format
+    """
+
+    # Built-in number formats that are dates, as in xlrd's .xlsx reader
+    DATE_FORMAT_IDS = frozenset(list(range(14, 23)) + list(range(45, 48)))
+
+    REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+    XML_SPACE = '{http://www.w3.org/XML/1998/namespace}space'
+    XML_WHITESPACE = '\t\n \r'
+    ESCAPE_RE = re.compile(r'_x[0-9A-Fa-f]{4}_')
+    ROOT_TAG_RE = re.compile(rb'<([\w:]+)[^>]*>')
+    SI_START_RE = re.compile(rb'<(?:\w+:)?si[\s/>]')
+    FORMAT_SKIP_RE = re.compile(r'"[^"]*"|[\\_*].|\[[^\]]*\]')
+    ERROR_CODES = {text: code for code, text in
+                   xlrd.error_text_from_code.items()}
+
+    def __init__(self, path):
+        """Open a file and read the workbook parts.
+
+        Args:
+            path (str): The path to the file
+        """
+        super().__init__(path)
+        self.archive = zipfile.ZipFile(path)
+        self.members = set(self.archive.namelist())
+        workbook_part = self.office_document()
+        root = ElementTree.fromstring(self.archive.read(workbook_part))
+        self.ns = root.tag[:root.tag.index('}') + 1]
+        properties = root.find(self.ns + 'workbookPr')
+        if properties is not None:
+            date1904 = properties.get('date1904', '0').lower()
+            self.datemode = 1 if date1904 in ('1', 'true') else 0
+        rels = self.relationships(workbook_part)
+        self.parts = []
+        self.names = []
+        sheets = root.find(self.ns + 'sheets')
+        for sheet in [] if sheets is None else sheets:
+            rel_id = next((v for k, v in sheet.attrib.items() if
+                           k.endswith('}id')), None)
+            rel_type, target = rels.get(rel_id, ('', None))
+            if rel_type.endswith('/worksheet') and target in self.members:
+                self.names.append(sheet.get('name'))
+                self.parts.append(target)
+        part_by_type = {rel_type.rpartition('/')[2]: target for rel_type,
+                        target in rels.values()}
+        self.shared_strings_part = part_by_type.get('sharedStrings')
+        self._shared_strings = None
+        self._string_data = None
+        self._string_starts = None
+        self._strings_found = {}
+        self.date_styles = self.read_date_styles(part_by_type.get('styles'))
+
+    def office_document(self):
+        """Return the name of the workbook part in the archive."""
+        rels = self.relationships('')
+        for rel_type, target in rels.values():
+            if rel_type.endswith('/officeDocument'):
+                return target
+        return 'xl/workbook.xml'
+
+    def relationships(self, part):
+        """Read the relationships of a part.
+
+        Args:
+            part (str): The name of the part in the archive
+
+        Returns:
+            A dictionary from relationship id to (type, target), with the
+            target resolved to a member name of the archive.
+        """
+        base, name = posixpath.split(part)
+        rels_part = posixpath.join(base, '_rels', name + '.rels')
+        try:
+            root = ElementTree.fromstring(self.archive.read(rels_part))
+        except KeyError:
+            return {}
+        result = {}
+        for rel in root.iter(self.REL_NS + 'Relationship'):
+            target = rel.get('Target')
+            if target.startswith('/'):
+                target = target[1:]
+            else:
+                target = posixpath.normpath(posixpath.join(base, target))
+            result[rel.get('Id')] = (rel.get('Type'), target)
+        return result
+
+    @classmethod
+    def is_date_format(cls, format_code):
+        """Tell whether a number format displays a date or time.
+
+        Quoted text, escaped characters and bracketed parts are ignored.
+        The format is a date format if it has more date characters than
+        number placeholders.
+
+        Args:
+            format_code (str): The number format, e.g. 'yyyy-mm-dd'
+
+        Returns:
+            bool: True if the format is a date format
+        """
+        reduced = cls.FORMAT_SKIP_RE.sub('', format_code)
+        if reduced.lower() in ('general', '@'):
+            return False
+        date_count = sum(reduced.count(c) for c in 'ymdhsYMDHS')
+        num_count = sum(reduced.count(c) for c in '0#?')
+        return date_count > num_count
+
+    def read_date_styles(self, part):
+        """Find the cell styles that format numbers as dates.
+
+        Args:
+            part (str): The name of the styles part in the archive
+
+        Returns:
+            A set of the indices of cell styles with a date format.
+        """
+        if part is None or part not in self.members:
+            return set()
+        root = ElementTree.fromstring(self.archive.read(part))
+        date_formats = set(self.DATE_FORMAT_IDS)
+        for num_fmt in root.iter(self.ns + 'numFmt'):
+            format_id = int(num_fmt.get('numFmtId'))
+            if self.is_date_format(num_fmt.get('formatCode', '')):
+                date_formats.add(format_id)
+            else:
+                date_formats.discard(format_id)
+        cell_xfs = root.find(self.ns + 'cellXfs')
+        if cell_xfs is None:
+            return set()
+        return {i for i, xf in enumerate(cell_xfs.iter(self.ns + 'xf')) if
+                int(xf.get('numFmtId', '0')) in date_formats}
+
+    def cooked_text(self, elem):
+        """Get the text of a <t> or <v> element as xlrd does."""
+        text = elem.text
+        if text is None:
+            return ''
+        if elem.get(self.XML_SPACE) != 'preserve':
+            text = text.strip(self.XML_WHITESPACE)
+        if '_' in text:
+            text = self.ESCAPE_RE.sub(lambda m: chr(int(m.group(0)[2:6], 16)),
+                                      text)
+        return text
+
+    def rich_text(self, elem):
+        """Get the text of an <si> or <is> element, joining rich text runs."""
+        t_tag = self.ns + 't'
+        r_tag = self.ns + 'r'
+        parts = []
+        for child in elem:
+            if child.tag == t_tag:
+                parts.append(self.cooked_text(child))
+            elif child.tag == r_tag:
+                parts.extend(self.cooked_text(t) for t in child if
+                             t.tag == t_tag)
+        return ''.join(parts)
+
+    @property
+    def shared_strings(self):
+        """The list of shared strings, read on first use."""
+        if self._shared_strings is None:
+            self._shared_strings = []
+            part = self.shared_strings_part
+            if part is not None and part in self.members:
+                si_tag = self.ns + 'si'
+                with self.archive.open(part) as stream:
+                    for _, elem in ElementTree.iterparse(stream):
+                        if elem.tag == si_tag:
+                            self._shared_strings.append(self.rich_text(elem))
+                            elem.clear()
+            self._string_data = None
+            self._string_starts = None
+            self._strings_found = {}
+        return self._shared_strings
+
+    def shared_string(self, index):
+        """Get one shared string, without reading the whole table.
+
+        Unless the table has been read already, the part is scanned for
+        where each <si> element starts, and only the ones asked for are
+        parsed. This is meant for the few strings in the first rows of a
+        sheet (see `head`). Whole sheets use `shared_strings`.
+
+        Args:
+            index (int): The index of the string in the table
+
+        Returns:
+            str: The string
+
+        Raises:
+            IndexError: If the table has no string at that index
+        """
+        if self._shared_strings is not None:
+            return self._shared_strings[index]
+        if self._string_starts is None:
+            self.find_shared_strings()
+        text = self._strings_found.get(index)
+        if text is None:
+            if not 0 <= index < len(self._string_starts) - 1:
+                raise IndexError('No shared string {}'.format(index))
+            start, end = self._string_starts[index:index + 2]
+            open_tag, close_tag, data = self._string_data
+            root = ElementTree.fromstring(open_tag + data[start:end] +
+                                          close_tag)
+            text = self.rich_text(root[0])
+            self._strings_found[index] = text
+        return text
+
+    def find_shared_strings(self):
+        """Find where each string starts in the shared strings part."""
+        part = self.shared_strings_part
+        data = b''
+        if part is not None and part in self.members:
+            data = self.archive.read(part)
+        root = self.ROOT_TAG_RE.search(data)
+        if root is None or root.group(0).endswith(b'/>'):
+            self._string_starts = [0]
+            return
+        close_tag = b'</' + root.group(1) + b'>'
+        self._string_data = (root.group(0), close_tag, data)
+        self._string_starts = [match.start() for match in
+                               self.SI_START_RE.finditer(data, root.end())]
+        self._string_starts.append(data.rindex(close_tag))
+
+    def sheet_names(self):
+        """Return a list of the sheet names, in order."""
+        return list(self.names)
+
+    def typed_rows(self, index, nrows=None):
+        """Iterate over the raw cell data of a sheet.
+
+        As in xlrd, rows are padded with empty cells up to the last column
+        that has a value, and end with the last row that has one. The
+        <dimension> of the sheet is only a hint for the width: rows are
+        held back until one of them fills it, then yielded as they are
+        parsed. Without a <dimension> over a range of cells, or if no row
+        fills it or one goes past it, the whole sheet is parsed first.
+
+        Args:
+            index (int): The index of the sheet
+            nrows (int): Stop parsing after this many rows. The default of
+                None parses the whole sheet.
+
+        Raises:
+            ValueError: If a row goes past a <dimension> that an earlier
+                row filled, since rows of the wrong width were already
+                yielded. Excel does not write such files.
+        """
+        part = self.parts[index]
+        ncols = self.sheet_width(part)
+        held = []
+        next_rowx = 0
+        for row in self.parse_sheet(part, nrows):
+            width = len(row[1])
+            if held is None:
+                if width > ncols:
+                    msg = 'Cells past the <dimension> of sheet {} in row {}'
+                    raise ValueError(msg.format(self.names[index],
+                                                row[0] + 1))
+                next_rowx = yield from self.pad_rows([row], ncols, next_rowx)
+                continue
+            held.append(row)
+            if ncols is not None and width > ncols:
+                ncols = None
+            if width == ncols:
+                next_rowx = yield from self.pad_rows(held, ncols, next_rowx)
+                held = None
+        if held:
+            ncols = max(len(types) for _, types, _ in held)
+            yield from self.pad_rows(held, ncols, next_rowx)
+
+    @staticmethod
+    def pad_rows(rows, ncols, next_rowx):
+        """Pad rows to a width, adding the empty rows between them.
+
+        Args:
+            rows (list): (rowx, types, values) tuples as from `parse_sheet`
+            ncols (int): The width of the sheet
+            next_rowx (int): The index of the next row to yield
+
+        Yields:
+            A (types, values) tuple of lists for each row.
+
+        Returns:
+            The index of the row after the last one yielded.
+        """
+        for rowx, types, values in rows:
+            for _ in range(next_rowx, rowx):
+                yield [xlrd.XL_CELL_EMPTY] * ncols, [''] * ncols
+            next_rowx = rowx + 1
+            pad = ncols - len(types)
+            if pad > 0:
+                types.extend([xlrd.XL_CELL_EMPTY] * pad)
+                values.extend([''] * pad)
+            yield types, values
+        return next_rowx
+
+    def head(self, index, nrows, stripstr=True):
+        """Read the first rows of a sheet, without parsing the rest."""
+        rows = self.typed_rows(index, nrows)
+        name = self.names[index]
+        return list(Worksheet.convert_rows(rows, name, self.datemode,
+                                           stripstr))
+
+    def sheet_width(self, part):
+        """Read the number of columns of a worksheet part.
+
+        Only the start of the part is parsed, up to its <dimension> element.
+
+        Args:
+            part (str): The name of the worksheet part in the archive
+
+        Returns:
+            int: The width given by the <dimension>, or None if there is
+            none before the cells or it names a single cell. Writers that
+            stream cells often give "A1" whatever the size of the sheet.
+        """
+        dimension_tag = self.ns + 'dimension'
+        data_tag = self.ns + 'sheetData'
+        with self.archive.open(part) as stream:
+            for _, elem in ElementTree.iterparse(stream, ('start',)):
+                if elem.tag == dimension_tag:
+                    first, _, last = elem.get('ref', '').partition(':')
+                    return column_index(last) + 1 if first and last else None
+                if elem.tag == data_tag:
+                    break
+        return None
+
+    def parse_sheet(self, part, nrows=None):
+        """Iterate over the cells of a worksheet part, one row at a time.
+
+        Shared strings are read in full for the whole part, or one by one
+        when only the first rows are read.
+
+        Args:
+            part (str): The name of the worksheet part in the archive
+            nrows (int): Stop after this many rows. The default of None reads
+                them all.
+
+        Yields:
+            A (rowx, types, values) tuple for each row with cells, where
+            types and values are lists.
+        """
+        row_tag = self.ns + 'row'
+        rowx = -1
+        if nrows is None:
+            shared_string = self.shared_strings.__getitem__
+        else:
+            shared_string = self.shared_string
+        with self.archive.open(part) as stream:
+            for _, elem in ElementTree.iterparse(stream):
+                if elem.tag != row_tag:
+                    continue
+                row_number = elem.get('r')
+                rowx = rowx + 1 if row_number is None else int(row_number) - 1
+                if nrows is not None and rowx >= nrows:
+                    break
+                types, values = self.parse_row(elem, rowx, shared_string)
+                elem.clear()
+                if types:
+                    yield rowx, types, values
+
+    # pylint: disable=too-many-branches,too-many-locals
+    def parse_row(self, row_elem, rowx, shared_string):
+        """Read the cells of a <row> element.
+
+        Args:
+            row_elem (Element): The row
+            rowx (int): The row index, for error messages
+            shared_string (callable): Gives a shared string from its index
+
+        Returns:
+            A (types, values) tuple of lists, up to the last cell with a
+            value.
+        """
+        v_tag = self.ns + 'v'
+        date_styles = self.date_styles
+        types = []
+        values = []
+        colx = -1
+        for cell in row_elem:
+            ref = cell.get('r')
+            colx = colx + 1 if ref is None else column_index(ref)
+            cell_type = cell.get('t', 'n')
+            text = cell.findtext(v_tag)
+            if cell_type == 's':
+                if not text:
+                    continue
+                ctype = xlrd.XL_CELL_TEXT
+                value = shared_string(int(text))
+            elif cell_type == 'n':
+                if not text:
+                    continue
+                ctype = xlrd.XL_CELL_NUMBER
+                if date_styles and int(cell.get('s', '0')) in date_styles:
+                    ctype = xlrd.XL_CELL_DATE
+                value = float(text)
+            elif cell_type == 'str':
+                ctype = xlrd.XL_CELL_TEXT
+                value_elem = cell.find(v_tag)
+                value = '' if value_elem is None else \
+                    self.cooked_text(value_elem)
+            elif cell_type == 'inlineStr':
+                inline = cell.find(self.ns + 'is')
+                value = text if inline is None else self.rich_text(inline)
+                if not value:
+                    continue
+                ctype = xlrd.XL_CELL_TEXT
+            elif cell_type == 'b':
+                ctype = xlrd.XL_CELL_BOOLEAN
+                value = 1 if text in ('1', 'true') else 0
+            elif cell_type == 'e':
+                ctype = xlrd.XL_CELL_ERROR
+                value = self.ERROR_CODES[text or '#N/A']
+            else:
+                msg = 'Unknown cell type {!r} in row {} column {}'
+                raise TypeError(msg.format(cell_type, rowx + 1, colx + 1))
+            if colx == len(types):
+                types.append(ctype)
+                values.append(value)
+            elif colx < len(types):
+                types[colx] = ctype
+                values[colx] = value
+            else:
+                pad = colx - len(types)
+                types.extend([xlrd.XL_CELL_EMPTY] * pad)
+                values.extend([''] * pad)
+                types.append(ctype)
+                values.append(value)
+        return types, values
+
+    def close(self):
+        """Close the zip archive."""
+        self.archive.close()
+
+
+class CsvReader(Reader):
+    """Reader for CSV and TSV files, or a directory of them.
+
+    A single file is one sheet. A directory gives one sheet per .csv or .tsv
+    file in it, sorted by file name, and each sheet is named after its file
+    without the extension. Files are read with the csv module as UTF-8 and
+    a .tsv file is tab-delimited.
+
+    Every file is streamed twice: once to find the extent of the data and
+    once to give the rows, so memory use does not depend on the file size.
+    Trailing empty rows and columns are left out, as in a spreadsheet.
+
+    Text is coerced to a number only when the number is written back as
+    the same text (e.g. '3' and '2.5', but not '007', '1.50' or '1e3'), so
+    the values are those of the spreadsheet the CSV was saved from. Empty
+    text is an empty cell.
+
+    Instance attributes:
+        files (list): The path of the file of each sheet
+        names (list): The sheet names
+    """
+
+    EXTENSIONS = ('.csv', '.tsv')
+    NUMBER_START = frozenset('-0123456789.')
+
+    def __init__(self, path):
+        """Find the files of a CSV source.
+
+        Args:
+            path (str): The path to a CSV or TSV file, or to a directory of
+                them
+        """
+        super().__init__(path)
+        if os.path.isdir(path):
+            self.files = sorted(
+                os.path.join(path, name) for name in os.listdir(path) if
+                os.path.splitext(name)[1].lower() in self.EXTENSIONS
+            )
+        else:
+            self.files = [path]
+        self.names = [os.path.splitext(os.path.basename(file))[0] for file in
+                      self.files]
+
+    def sheet_names(self):
+        """Return a list of the sheet names, in order."""
+        return list(self.names)
+
+    def csv_rows(self, index):
+        """Iterate over the rows of text of a sheet's file."""
+        path = self.files[index]
+        delimiter = '\t' if path.lower().endswith('.tsv') else ','
+        with open(path, newline='', encoding='utf-8-sig') as file:
+            yield from csv.reader(file, delimiter=delimiter)
+
+    def typed_rows(self, index):
+        """Iterate over the raw cell data of a sheet."""
+        nrows = 0
+        ncols = 0
+        for i, row in enumerate(self.csv_rows(index)):
+            width = len(row)
+            while width and not row[width - 1]:
+                width -= 1
+            if width:
+                nrows = i + 1
+                ncols = max(ncols, width)
+        for row in itertools.islice(self.csv_rows(index), nrows):
+            row = row[:ncols]
+            if len(row) < ncols:
+                row.extend([''] * (ncols - len(row)))
+            yield self.typed_row(row)
+
+    @classmethod
+    def typed_row(cls, row):
+        """Get xlrd cell types and values for a row of text.
+
+        Args:
+            row (list): The text of each cell
+
+        Returns:
+            A (types, values) tuple of lists.
+        """
+        types = []
+        values = []
+        for text in row:
+            ctype = xlrd.XL_CELL_TEXT
+            value = text
+            if not text:
+                ctype = xlrd.XL_CELL_EMPTY
+            elif text[0] in cls.NUMBER_START:
+                try:
+                    number = float(text)
+                except ValueError:
+                    pass
+                else:
+                    if math.isfinite(number) and text == (
+                            str(int(number)) if number.is_integer() else
+                            repr(number)):
+                        ctype = xlrd.XL_CELL_NUMBER
+                        value = number
+            types.append(ctype)
+            values.append(value)
+        return types, values
+
+
+_COLUMN_INDEX = {}
+
+
+def column_index(ref):
+    """Get the 0-based column index of a cell reference like 'AB12'.
+
+    Args:
+        ref (str): The cell reference
+
+    Returns:
+        int: The column index
+    """
+    letters = ref.rstrip('0123456789')
+    try:
+        return _COLUMN_INDEX[letters]
+    except KeyError:
+        index = 0
+        for letter in letters.replace('$', ''):
+            index = index * 26 + ord(letter.upper()) - 64
+        _COLUMN_INDEX[letters] = index - 1
+        return index - 1
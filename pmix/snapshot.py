@@ -0,0 +1,337 @@
+"""Module for a compact binary snapshot format of parsed workbooks.
+
+A snapshot keeps the converted cell values and highlights of every sheet,
+so that a workbook can be passed between pipeline stages without being
+written to and parsed from Excel again. It is not a pickle, so loading a
+snapshot does not run code from the file.
+
+Layout (all integers little-endian):
+
+    magic (8 bytes) b'PMIXSNAP', version (uint32)
+    string table: count (uint32), byte lengths (uint32 each), UTF-8 data
+    sheet count (uint32), then for each sheet:
+        name (uint32 string index), nrows (uint32), ncols (uint32)
+        for each column: kinds (uint8 each), payloads (int64 each)
+        highlight count (uint32), (row, col, color string index) (uint32 each)
+
+Every distinct string is stored once. The payload of a cell depends on its
+kind: an index into the string table for text and for integers that do not
+fit in 64 bits, the value for integers, booleans and error codes, the IEEE
+754 bits for floats, the proleptic ordinal for dates, and a count of
+microseconds for date times (since day 0) and times (since midnight).
+Reading a column is a copy of two arrays followed by one pass to build the
+values.
+"""
+import array
+import datetime
+import struct
+import sys
+
+from pmix.cell import CellError
+from pmix.columnstore import ColumnStore
+from pmix.readers import Reader
+from pmix.worksheet import Worksheet
+
+
+MAGIC = b'PMIXSNAP'
+VERSION = 1
+
+# Cell kinds
+EMPTY, TEXT, INT, FLOAT, BOOL, ERROR, DATE, DATETIME, TIME, BIG_INT = range(10)
+
+INT64_MIN = -(1 << 63)
+INT64_MAX = (1 << 63) - 1
+MICROSECONDS_PER_DAY = 86400 * 10**6
+
+
+def to_little_endian(values):
+    """Swap the bytes of an array in place on big-endian machines."""
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+
+def time_to_microseconds(value):
+    """Get the number of microseconds since midnight of a time."""
+    seconds = (value.hour * 60 + value.minute) * 60 + value.second
+    return seconds * 10**6 + value.microsecond
+
+
+def microseconds_to_time(microseconds):
+    """Get the time from the number of microseconds since midnight."""
+    seconds, microsecond = divmod(microseconds, 10**6)
+    minutes, second = divmod(seconds, 60)
+    hour, minute = divmod(minutes, 60)
+    return datetime.time(hour, minute, second, microsecond)
+
+
+class SnapshotWriter:
+    """Write the sheets of a workbook to a snapshot file.
+
+    Instance attributes:
+        strings (list): The string table
+        string_index (dict): Maps each string to its index in the table
+    """
+
+    def __init__(self):
+        """Initialize with an empty string table."""
+        self.strings = []
+        self.string_index = {}
+
+    def string_id(self, text):
+        """Get the index of a string in the table, adding it if needed."""
+        index = self.string_index.get(text)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(text)
+            self.string_index[text] = index
+        return index
+
+    # pylint: disable=too-many-branches
+    def encode_column(self, values):
+        """Encode a column of cell values.
+
+        Args:
+            values (sequence): The cell values
+
+        Returns:
+            A tuple (kinds, payloads) of array('B') and array('q').
+
+        Raises:
+            TypeError: If a value has a type that cannot be stored.
+        """
+        kinds = array.array('B', bytes(len(values)))
+        payloads = array.array('q', bytes(8 * len(values)))
+        string_id = self.string_id
+        for i, value in enumerate(values):
+            # bool and datetime are checked before their base classes
+            if value is None:
+                continue
+            if isinstance(value, str):
+                kind, payload = TEXT, string_id(value)
+            elif isinstance(value, bool):
+                kind, payload = BOOL, int(value)
+            elif isinstance(value, int):
+                if INT64_MIN <= value <= INT64_MAX:
+                    kind, payload = INT, value
+                else:
+                    kind, payload = BIG_INT, string_id(str(value))
+            elif isinstance(value, float):
+                kind = FLOAT
+                payload = struct.unpack('<q', struct.pack('<d', value))[0]
+            elif isinstance(value, CellError):
+                kind, payload = ERROR, value.value
+            elif isinstance(value, datetime.datetime):
+                kind = DATETIME
+                payload = (value.toordinal() * MICROSECONDS_PER_DAY +
+                           time_to_microseconds(value.time()))
+            elif isinstance(value, datetime.date):
+                kind, payload = DATE, value.toordinal()
+            elif isinstance(value, datetime.time):
+                kind, payload = TIME, time_to_microseconds(value)
+            else:
+                msg = 'Cannot store value {!r} in a snapshot'.format(value)
+                raise TypeError(msg)
+            kinds[i] = kind
+            payloads[i] = payload
+        return kinds, payloads
+
+    def write(self, sheets, path):
+        """Write sheets to a snapshot file.
+
+        Args:
+            sheets (iterable): The worksheets to write
+            path (str): The path of the snapshot file
+        """
+        sheets = list(sheets)
+        body = []
+        for sheet in sheets:
+            if sheet.is_columnar():
+                columns = sheet.data.columns
+                highlights = sheet.data.highlights.items()
+            else:
+                rows = list(sheet.row_values())
+                ncols = max((len(row) for row in rows), default=0)
+                columns = [[row[j] if j < len(row) else None for row in rows]
+                           for j in range(ncols)]
+                highlights = [((i, j), color) for i, row in
+                              enumerate(sheet.row_highlights()) for j, color
+                              in row.items()]
+            header = array.array('I', [self.string_id(sheet.name), len(sheet),
+                                       len(columns)])
+            body.append(to_little_endian(header).tobytes())
+            for column in columns:
+                kinds, payloads = self.encode_column(column)
+                body.append(kinds.tobytes())
+                body.append(to_little_endian(payloads).tobytes())
+            marks = array.array('I', [len(highlights)])
+            for (i, j), color in highlights:
+                marks.extend((i, j, self.string_id(color)))
+            body.append(to_little_endian(marks).tobytes())
+        encoded = [text.encode('utf-8') for text in self.strings]
+        lengths = array.array('I', [len(self.strings)])
+        lengths.extend(len(data) for data in encoded)
+        with open(path, 'wb') as file:
+            file.write(MAGIC)
+            file.write(struct.pack('<I', VERSION))
+            file.write(to_little_endian(lengths).tobytes())
+            file.write(b''.join(encoded))
+            file.write(struct.pack('<I', len(sheets)))
+            file.writelines(body)
+
+
+class SnapshotReader(Reader):
+    """Reader for snapshot files written by `Workbook.save_snapshot`.
+
+    The whole file is decoded when opened. Values are stored converted, so
+    stripstr has no effect on them. Snapshots are not put in a
+    WorkbookCache, since they load about as fast and also keep highlights.
+
+    Instance attributes:
+        names (list): The sheet names
+        nrows (list): The number of rows of each sheet, which is kept even
+            for sheets without columns
+        columns (list): For each sheet, the list of its columns of values.
+            Emptied once the sheet is released.
+        marks (list): For each sheet, a dictionary from (row, col) to the
+            highlight color of the highlighted cells
+    """
+
+    CACHEABLE = False
+
+    def __init__(self, path):
+        """Read a snapshot file.
+
+        Args:
+            path (str): The path to the file
+
+        Raises:
+            ValueError: If the file is not a snapshot of a known version.
+        """
+        super().__init__(path)
+        with open(path, 'rb') as file:
+            self.buffer = memoryview(file.read())
+        self.offset = 0
+        if bytes(self.take(len(MAGIC))) != MAGIC:
+            raise ValueError('Not a pmix snapshot: "{}"'.format(path))
+        version = self.read_array('I', 1)[0]
+        if version != VERSION:
+            msg = 'Unsupported snapshot version {} in "{}"'
+            raise ValueError(msg.format(version, path))
+        strings = self.read_strings()
+        self.names = []
+        self.nrows = []
+        self.columns = []
+        self.marks = []
+        for _ in range(self.read_array('I', 1)[0]):
+            name, nrows, ncols = self.read_array('I', 3)
+            self.names.append(strings[name])
+            self.nrows.append(nrows)
+            self.columns.append([self.read_column(nrows, strings) for _ in
+                                 range(ncols)])
+            marks = self.read_array('I', 3 * self.read_array('I', 1)[0])
+            self.marks.append({(marks[k], marks[k + 1]): strings[marks[k + 2]]
+                               for k in range(0, len(marks), 3)})
+        self.buffer = None
+
+    def take(self, size):
+        """Get the next bytes of the file."""
+        data = self.buffer[self.offset:self.offset + size]
+        if len(data) < size:
+            raise ValueError('Truncated snapshot: "{}"'.format(self.path))
+        self.offset += size
+        return data
+
+    def read_array(self, typecode, count):
+        """Read an array of little-endian numbers."""
+        values = array.array(typecode)
+        values.frombytes(self.take(count * values.itemsize))
+        return to_little_endian(values)
+
+    def read_strings(self):
+        """Read the string table."""
+        lengths = self.read_array('I', self.read_array('I', 1)[0])
+        data = self.take(sum(lengths))
+        strings = []
+        start = 0
+        for length in lengths:
+            strings.append(str(data[start:start + length], 'utf-8'))
+            start += length
+        return strings
+
+    def read_column(self, nrows, strings):
+        """Read and decode a column of values."""
+        kinds = bytes(self.take(nrows))
+        payloads = self.read_array('q', nrows)
+        if kinds.count(TEXT) == nrows:
+            return [strings[payload] for payload in payloads]
+        values = []
+        for kind, payload in zip(kinds, payloads):
+            if kind == EMPTY:
+                values.append(None)
+            elif kind == TEXT:
+                values.append(strings[payload])
+            else:
+                values.append(self.decode(kind, payload, strings))
+        return values
+
+    @staticmethod
+    def decode(kind, payload, strings):
+        """Decode a value that is neither empty nor text."""
+        if kind == INT:
+            return payload
+        if kind == FLOAT:
+            return struct.unpack('<d', struct.pack('<q', payload))[0]
+        if kind == BOOL:
+            return bool(payload)
+        if kind == ERROR:
+            return CellError(payload)
+        if kind == DATE:
+            return datetime.date.fromordinal(payload)
+        if kind == DATETIME:
+            days, microseconds = divmod(payload, MICROSECONDS_PER_DAY)
+            return datetime.datetime.combine(
+                datetime.date.fromordinal(days),
+                microseconds_to_time(microseconds))
+        if kind == TIME:
+            return microseconds_to_time(payload)
+        if kind == BIG_INT:
+            return int(strings[payload])
+        raise ValueError('Unknown value kind {} in snapshot'.format(kind))
+
+    def sheet_names(self):
+        """Return a list of the sheet names, in order."""
+        return list(self.names)
+
+    def rows(self, index, stripstr=True):
+        """Iterate over the rows of a sheet."""
+        columns = self.columns[index]
+        return ([column[i] for column in columns] for i in
+                range(self.nrows[index]))
+
+    def highlights(self, index):
+        """Return a dictionary of the highlighted cells of a sheet."""
+        return self.marks[index]
+
+    # pylint: disable=too-many-arguments
+    def worksheet(self, index, stripstr=True, columnar=False, intern=None,
+                  fail_fast=False):
+        """Build a Worksheet from a sheet.
+
+        A columnar worksheet is made directly from copies of the decoded
+        columns, without going through rows. Its Excel errors are then
+        located on first request.
+        """
+        if not columnar or intern or isinstance(intern, dict) or fail_fast:
+            return super().worksheet(index, stripstr, columnar, intern,
+                                     fail_fast)
+        columns = [list(column) for column in self.columns[index]]
+        store = ColumnStore(columns, dict(self.marks[index]))
+        store.nrows = self.nrows[index]
+        return Worksheet(data=store, name=self.names[index])
+
+    def release(self, index):
+        """Free the decoded values of a sheet that has been read."""
+        self.nrows[index] = 0
+        self.columns[index] = []
+        self.marks[index] = {}
@@ -1,5 +1,6 @@
 """Useful string functions for PMIX."""
 
+import os.path
 import re
 
 
@@ -175,3 +176,26 @@ def number_to_excel_column(col):
     if div > 0:
         return letters[div - 1] + primary_letter
     return primary_letter
+
+
+def excel_outpath(path, tag):
+    """Get the default path for an Excel file derived from a source file.
+
+    Results are always written as Excel. A source that is not an Excel file,
+    such as a CSV file or a directory of them, gets the .xlsx extension.
+
+    Args:
+        path (str): The path to the source file or directory
+        tag (str): Added to the file name, e.g. '-diff'
+
+    Returns:
+        str: The output path, e.g. 'form-diff.xlsx' for 'form.xlsx'
+    """
+    path = os.path.normpath(path)
+    if os.path.isdir(path):
+        filename, extension = path, ''
+    else:
+        filename, extension = os.path.splitext(path)
+    if extension not in ('.xls', '.xlsx'):
+        extension = '.xlsx'
+    return filename + tag + extension
@@ -91,24 +91,21 @@ class TranslationDict:
     def translations_from_xlsform(self, xlsform, correct=False):
         """Get translations from an Xlsform object.
 
-        This uses the Xlsform's lazy_translation_pairs method.
+        This uses the Xlstab's iter_translation_pairs method.
 
         Args:
             xlsform (Xlsform): The Xlsform object to get translations from.
             correct (bool): Whether or not the input file is treated as correct
         """
         for xlstab in xlsform:
-            for pair in xlstab.lazy_translation_pairs(base=self.base):
-                first, second = pair
-                first_cell = first['cell']
-                second_cell = second['cell']
-                if first_cell.is_blank() or second_cell.is_blank():
-                    continue
-                src = str(first_cell)
-                language = second['language']
+            pairs = xlstab.iter_translation_pairs(base=self.base,
+                                                  complete=True)
+            for i, first_cell, second_cell, _, other in pairs:
+                second = xlstab.pair_dict(i, second_cell, other)
                 second['file'] = xlsform.file
                 second['sheet'] = xlstab.name
-                self.add_translation(src, second, language, correct)
+                self.add_translation(str(first_cell), second, other.language,
+                                     correct)
 
     def translations_from_workbook(self, workbook, correct=False):
         """Get translations from a workbook object.
@@ -4,42 +4,252 @@ import itertools
 import copy
 import os.path
 import argparse
+import sys
+from collections import Counter, namedtuple
+from concurrent.futures import ProcessPoolExecutor
 
-import xlrd
 import xlsxwriter
 
 from pmix import utils
 from pmix import wbformat
-from pmix.worksheet import Worksheet
+from pmix.cache import WorkbookCache
+from pmix.error import SpreadsheetError
+from pmix.readers import CsvReader, XlrdReader, XlsxReader
+from pmix.snapshot import SnapshotReader, SnapshotWriter
+from pmix.worksheet import Worksheet, import_numpy
+
+
+LoadResult = namedtuple('LoadResult', ['path', 'workbook', 'error'])
+
+
+def load_one(cls, path, kwargs):
+    """Load a single file, capturing any error.
+
+    This is a module-level function so that it can be sent to worker
+    processes.
+
+    Args:
+        cls (type): Workbook or a subclass to instantiate
+        path (str): The path to the file
+        kwargs (dict): Keyword arguments for the constructor
+
+    Returns:
+        LoadResult: With either the workbook or the error set.
+    """
+    try:
+        return LoadResult(path, cls(path, **kwargs), None)
+    # pylint: disable=broad-except
+    except Exception as err:
+        return LoadResult(path, None, err)
+
+
+def read_one(cls, path, stripstr, cache, engine):
+    """Convert the sheets of a single file to values, capturing any error.
+
+    This is a module-level function so that it can be sent to worker
+    processes. Only plain values are sent back, which pickle much faster
+    than a whole workbook.
+
+    Args:
+        cls (type): Workbook or a subclass
+        path (str): The path to the file
+        stripstr (bool): Remove trailing / leading whitespace from text?
+        cache (bool or WorkbookCache): The cache to use, if any
+        engine (str): The name of the reader backend (see `reader_for`)
+
+    Returns:
+        A tuple (sheets, error). sheets is a list of (name, rows) tuples as
+        from `Workbook.sheet_values`, or None if the reader keeps more than
+        values (e.g. highlights), so the file should be loaded as usual.
+    """
+    try:
+        if not cls.reader_for(path, engine)[1].CACHEABLE:
+            return None, None
+        return cls.sheet_values(path, stripstr, cache, engine), None
+    # pylint: disable=broad-except
+    except Exception as err:
+        return None, err
 
 
 class Workbook:
-    """Class to represent an Excel file."""
+    """Class to represent an Excel file.
+
+    Class attributes:
+        READERS (dict): The registry of reader backends, from engine name to
+            a subclass of `readers.Reader`.
+        ENGINES (dict): The default engine name for each file extension.
+            Directories use the key os.sep.
+    """
 
-    def __init__(self, path, stripstr=True):
+    READERS = {
+        'xlrd': XlrdReader,
+        'native': XlsxReader,
+        'csv': CsvReader,
+        'snapshot': SnapshotReader,
+    }
+
+    ENGINES = {
+        '.xls': 'xlrd',
+        '.xlsx': 'native',
+        '.csv': 'csv',
+        '.tsv': 'csv',
+        '.pmix': 'snapshot',
+        os.sep: 'csv',
+    }
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, path, stripstr=True, lazy=False, columnar=False,
+                 cache=None, engine=None, intern=None, fail_fast=False,
+                 sheets=None):
         """Initialize by storing data from spreadsheet.
 
         Args:
-            path (str): The path where to find the Excel file
+            path (str): The path where to find the Excel file. A CSV or TSV
+                file, or a directory of them with one file per sheet, is
+                also accepted (see `readers.CsvReader`).
             stripstr (bool): Remove trailing / leading whitespace from text?
+            lazy (bool): If true, convert a sheet only the first time it is
+                accessed. Until then, it is represented by a SheetLoader.
+            columnar (bool): If true, store sheet data column by column (see
+                ColumnStore) instead of as rows of Cell objects.
+            cache (bool or WorkbookCache): If true, read the converted values
+                from the default WorkbookCache when the file is unchanged,
+                and store them there otherwise. A WorkbookCache instance is
+                used as is. The cache takes precedence over lazy loading.
+            engine (str): The name of the reader backend in READERS. By
+                default, it is chosen by file extension from ENGINES.
+            intern (bool or dict): If True or a dict, equal text values share
+                one str object (see `Worksheet.from_rows`). True interns for
+                the whole process. A dict is used as the table of strings, so
+                passing the same dict to several workbooks shares strings
+                among them.
+            fail_fast (bool): If true, raise SpreadsheetError at the first
+                Excel error value found while converting a sheet. With lazy
+                loading, this happens when the sheet is first accessed.
+            sheets (list): The converted values of the file, as from
+                `sheet_values`. If given, the file is not read, and lazy,
+                cache and engine are ignored.
         """
         self.file = path
         self.data = []
+        self._sheet_index = {}
+        self._sheet_count = 0
 
-        ext = os.path.splitext(path)[1]
-        if ext in ('.xls', '.xlsx'):
-            self.data = self.data_from_excel(path, stripstr)
+        if sheets is not None:
+            data = [Worksheet.from_rows(rows, name, columnar, intern,
+                                        fail_fast) for name, rows in sheets]
+            self.data = [self.init_sheet(ws) for ws in data]
+            return
+        if cache and not self.reader_for(path, engine)[1].CACHEABLE:
+            cache = None
+        if lazy and not cache:
+            self.data = self.loaders_from_excel(path, stripstr, columnar,
+                                                engine, intern, fail_fast)
         else:
-            msg = 'Unsupported file type. Extension: "{}"'.format(ext)
-            raise TypeError(msg)
+            data = self.data_from_excel(path, stripstr, columnar, cache,
+                                        engine, intern, fail_fast)
+            self.data = [self.init_sheet(ws) for ws in data]
+
+    @classmethod
+    def reader_for(cls, path, engine=None):
+        """Get the reader backend for a file.
+
+        Args:
+            path (str): The path to the file
+            engine (str): The name of the reader backend in READERS. By
+                default, it is chosen by file extension from ENGINES.
+
+        Returns:
+            A tuple (engine, reader), the engine name and the reader class.
+
+        Raises:
+            TypeError: If no engine is given and the file extension is not
+                supported.
+            KeyError: If the engine is unknown.
+        """
+        if engine is None:
+            if os.path.isdir(path):
+                ext = os.sep
+            else:
+                ext = os.path.splitext(path)[1]
+            try:
+                engine = cls.ENGINES[ext]
+            except KeyError:
+                msg = 'Unsupported file type. Extension: "{}"'.format(ext)
+                raise TypeError(msg)
+        return engine, cls.READERS[engine]
+
+    @classmethod
+    def iter_load(cls, paths, workers=None, **kwargs):
+        """Load many files, in parallel if requested.
+
+        Files are parsed in a pool of worker processes, which send back only
+        the converted cell values (see `read_one`). The worksheets are built
+        from them here, in the order of the input paths, so lazy loading
+        does not apply. Files whose reader keeps more than values, such as
+        snapshots, are loaded here as usual.
+
+        Args:
+            paths (sequence of str): The paths to the files
+            workers (int): The number of worker processes. The default of
+                None uses the number of processors. With 1, the files are
+                loaded one by one in this process.
+            **kwargs: Keyword arguments for the constructor, e.g. stripstr
+
+        Yields:
+            A LoadResult for each path, with the loaded object in `workbook`
+            or the exception raised while loading in `error`.
+        """
+        paths = list(paths)
+        if workers == 1 or len(paths) <= 1:
+            for path in paths:
+                yield load_one(cls, path, kwargs)
+            return
+        read_args = (kwargs.get(name) for name in ('cache', 'engine'))
+        read_args = [kwargs.get('stripstr', True), *read_args]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            jobs = executor.map(read_one, itertools.repeat(cls), paths,
+                                *(itertools.repeat(arg) for arg in read_args))
+            for path, (sheets, error) in zip(paths, jobs):
+                if error is not None:
+                    yield LoadResult(path, None, error)
+                else:
+                    yield load_one(cls, path, dict(kwargs, sheets=sheets))
+
+    @classmethod
+    def load_many(cls, paths, workers=None, **kwargs):
+        """Load many files, in parallel if requested.
+
+        See `iter_load` for the arguments.
+
+        Returns:
+            A list of LoadResult, one per path, in the order of the input.
+        """
+        return list(cls.iter_load(paths, workers, **kwargs))
+
+    @staticmethod
+    def init_sheet(worksheet):
+        """Prepare a newly converted worksheet for this workbook.
+
+        Subclasses override this to use a more specific Worksheet class.
+
+        Args:
+            worksheet (Worksheet): The worksheet converted from file
+
+        Returns:
+            The worksheet to store in this workbook.
+        """
+        return worksheet
 
     def sheetnames(self):
         """Get sheetnames from this Workbook.
 
+        Sheets that have not been loaded yet are not converted.
+
         Returns:
             A tuple of string, in the order of the sheets.
         """
-        return tuple(sheet.name for sheet in self)
+        return tuple(sheet.name for sheet in self.data)
 
     @staticmethod
     def init_formats(wb):
@@ -73,34 +283,158 @@ class Workbook:
         sheet_iters = [sheet.cell_iter() for sheet in self]
         return itertools.chain(*sheet_iters)
 
-    def write_out(self, path, strings=False):
+    def write_out(self, path, strings=False, constant_memory=False):
         """Write this Workbook out to file.
 
+        A path with the .pmix extension gets a snapshot instead (see
+        `save_snapshot`), so that command line tools can hand their result
+        to the next tool without going through Excel.
+
         Args:
             path (str): The path where to write the Excel file
             strings (bool): False if the original value should be written,
                 otherwise the string value of the cell is used.
+            constant_memory (bool): If true, use xlsxwriter's constant_memory
+                mode, which flushes each row to disk once the next row is
+                started instead of keeping the whole document in memory.
         """
-        wb = xlsxwriter.Workbook(path)
+        if os.path.splitext(path)[1] == '.pmix' and not strings:
+            self.save_snapshot(path)
+            return
+        options = {'constant_memory': True} if constant_memory else {}
+        wb = xlsxwriter.Workbook(path, options)
         formats = self.init_formats(wb)
-        for worksheet in self.data:
+        for worksheet in self:
             ws = wb.add_worksheet(worksheet.name)
-            for i, line in enumerate(worksheet):
-                for j, cell in enumerate(line):
-                    this_value = str(cell) if strings else cell.value
-                    if cell.highlight is None:
-                        this_format = None
-                    else:
-                        this_format = formats[cell.highlight]
-                    if this_format is None:
-                        ws.write(i, j, this_value)
-                    else:
-                        ws.write(i, j, this_value, this_format)
+            rows = zip(worksheet.row_values(), worksheet.row_highlights())
+            for i, (values, highlights) in enumerate(rows):
+                if strings:
+                    values = ['' if v is None else str(v) for v in values]
+                self.write_row_values(ws, i, values, highlights, formats)
         wb.close()
 
+    @staticmethod
+    def write_row_values(ws, row, values, highlights, formats):
+        """Write one row of values to an xlsxwriter worksheet.
+
+        Runs of consecutive unhighlighted values are written with a single
+        `write_row` call. Blank values without a highlight are skipped, and
+        highlighted cells are written one by one with their format.
+
+        Args:
+            ws (xlsxwriter.Worksheet): The worksheet to write to
+            row (int): The row index
+            values (sequence): The cell values of the row
+            highlights (dict): Maps column index to highlight color, for the
+                highlighted cells of the row only
+            formats (dict): Maps highlight color to xlsxwriter format, as
+                returned by `init_formats`
+        """
+        run = []
+        run_start = 0
+        for j, value in enumerate(values):
+            color = highlights.get(j) if highlights else None
+            if color is None and value is not None and value != '':
+                if not run:
+                    run_start = j
+                run.append(value)
+                continue
+            if run:
+                ws.write_row(row, run_start, run)
+                run = []
+            if color is not None:
+                ws.write(row, j, value, formats[color])
+        if run:
+            ws.write_row(row, run_start, run)
+
+    def to_csv_dir(self, outdir, strings=True):
+        """Write every sheet of this workbook to a CSV file in a directory.
+
+        Each sheet is written to "<sheet name>.csv". Sheets that have not
+        been loaded yet are converted first. The directory can be read back
+        as a workbook (see `readers.CsvReader`).
+
+        Args:
+            outdir (str): The directory, created if needed
+            strings (bool): False if the original value should be written,
+                otherwise the string value of the cell is used.
+
+        Returns:
+            A list of the paths written, in the order of the sheets.
+        """
+        os.makedirs(outdir, exist_ok=True)
+        sheets = list(self)
+        paths = [os.path.join(outdir, sheet.name + '.csv') for sheet in sheets]
+        for sheet, path in zip(sheets, paths):
+            sheet.to_csv(path, strings)
+        return paths
+
+    def to_arrays(self, sheet, dtype=object, start=1):
+        """Get the columns of a sheet as NumPy masked arrays.
+
+        Columns without a header are left out, and a repeated header gives
+        its first column. See `Worksheet.column_array`.
+
+        Args:
+            sheet (str or int): The sheet name or index
+            dtype: The NumPy dtype of every array, or a dict from header to
+                dtype, where headers not in the dict get object arrays.
+            start (int): The row to start with. Defaults to 1 to skip the
+                header row.
+
+        Returns:
+            A dictionary from header to numpy.ma.MaskedArray, in column order.
+
+        Raises:
+            ImportError: If NumPy is not installed
+        """
+        import_numpy('Workbook.to_arrays')
+        worksheet = self[sheet]
+        result = {}
+        for header, col in worksheet.header_index().items():
+            if not header:
+                continue
+            this_dtype = dtype.get(header, object) if isinstance(dtype, dict) \
+                else dtype
+            result[header] = worksheet.column_array(col, this_dtype, start)
+        return result
+
+    def save_snapshot(self, path):
+        """Save the values and highlights of this workbook to a snapshot.
+
+        A snapshot is much faster to load than an Excel file. It is read by
+        `load_snapshot`, or by the constructor for the .pmix extension. See
+        `pmix.snapshot` for the format.
+
+        Args:
+            path (str): The path of the snapshot file, usually ending in .pmix
+        """
+        SnapshotWriter().write(self, path)
+
+    @classmethod
+    def load_snapshot(cls, path, **kwargs):
+        """Load a workbook from a snapshot written by `save_snapshot`.
+
+        Args:
+            path (str): The path of the snapshot file
+            **kwargs: Other keyword arguments for the constructor, e.g.
+                lazy or columnar
+
+        Returns:
+            An instance of this class.
+        """
+        return cls(path, engine='snapshot', **kwargs)
+
     def copy(self):
-        """Make a deep copy of this workbook."""
-        return copy.deepcopy(self)
+        """Make a copy of this workbook that shares data with the original.
+
+        Sheets that have not been loaded yet are converted first. Every sheet
+        is copied with `Worksheet.copy`, so rows and cells are only cloned
+        when they are changed in either workbook.
+        """
+        result = copy.copy(self)
+        result.data = [sheet.copy() for sheet in self]
+        return result
 
     def get_excel_errors(self):
         """Get all Excel errors in this workbook.
@@ -114,33 +448,201 @@ class Workbook:
             result[sheet.name] = sheet.get_excel_errors()
         return result
 
-    @staticmethod
-    def data_from_excel(path, stripstr=True):
-        """Get data from Excel through xlrd.
+    # pylint: disable=too-many-arguments
+    @classmethod
+    def data_from_excel(cls, path, stripstr=True, columnar=False, cache=None,
+                        engine=None, intern=None, fail_fast=False):
+        """Get data from Excel through a reader backend.
 
         Args:
             path (str): The path where to find the Excel file.
             stripstr (bool): Remove trailing / leading whitespace from text?
+            columnar (bool): Store sheet data in a ColumnStore?
+            cache (bool or WorkbookCache): The cache to use, if any. True
+                means the default WorkbookCache.
+            engine (str): The name of the reader backend (see `reader_for`)
+            intern (bool or dict): Intern text values? See `__init__`.
+            fail_fast (bool): Stop at the first Excel error? See `__init__`.
 
         Returns:
             A list of worksheets, matching the source Excel file.
         """
+        reader_class = cls.reader_for(path, engine)[1]
+        if cache and reader_class.CACHEABLE:
+            sheets = cls.sheet_values(path, stripstr, cache, engine)
+            return [Worksheet.from_rows(rows, name, columnar, intern,
+                                        fail_fast) for name, rows in sheets]
         result = []
-        with xlrd.open_workbook(path) as book:
-            datemode = book.datemode
-            for i in range(book.nsheets):
-                ws = book.sheet_by_index(i)
-                my_ws = Worksheet.from_sheet(ws, datemode, stripstr)
-                result.append(my_ws)
+        with reader_class(path) as reader:
+            for i in range(len(reader.sheet_names())):
+                result.append(reader.worksheet(i, stripstr, columnar, intern,
+                                               fail_fast))
+                reader.release(i)
         return result
 
+    @classmethod
+    def sheet_values(cls, path, stripstr=True, cache=None, engine=None):
+        """Get the cell values of every sheet, through a cache if given.
+
+        Args:
+            path (str): The path where to find the Excel file.
+            stripstr (bool): Remove trailing / leading whitespace from text?
+            cache (bool or WorkbookCache): The cache to use, if any. True
+                means the default WorkbookCache.
+            engine (str): The name of the reader backend (see `reader_for`)
+
+        Returns:
+            A list of (name, rows) tuples, where rows is a list of lists of
+            cell values.
+        """
+        engine = cls.reader_for(path, engine)[0]
+        if not cache:
+            return cls.rows_from_excel(path, stripstr, engine)
+        if cache is True:
+            cache = WorkbookCache()
+        key = cache.fingerprint(path, stripstr=stripstr, engine=engine)
+        sheets = cache.get_entry(key)
+        if sheets is None:
+            sheets = cls.rows_from_excel(path, stripstr, engine)
+            cache.put_entry(key, sheets)
+        return sheets
+
+    @classmethod
+    def rows_from_excel(cls, path, stripstr=True, engine=None):
+        """Get the cell values of every sheet in an Excel file.
+
+        Args:
+            path (str): The path where to find the Excel file.
+            stripstr (bool): Remove trailing / leading whitespace from text?
+            engine (str): The name of the reader backend (see `reader_for`)
+
+        Returns:
+            A list of (name, rows) tuples, where rows is a list of lists of
+            cell values.
+        """
+        return [(name, list(rows)) for name, rows in
+                cls.iter_sheets(path, stripstr, engine)]
+
+    # pylint: disable=too-many-arguments
+    @classmethod
+    def loaders_from_excel(cls, path, stripstr=True, columnar=False,
+                           engine=None, intern=None, fail_fast=False):
+        """Get placeholders for the sheets in an Excel file.
+
+        Only the workbook globals are read here (xlrd parses .xlsx in full).
+        No sheet is converted until its SheetLoader is loaded. The file is
+        closed once every sheet has been loaded, or by `close`.
+
+        Args:
+            path (str): The path where to find the Excel file.
+            stripstr (bool): Remove trailing / leading whitespace from text?
+            columnar (bool): Store sheet data in a ColumnStore?
+            engine (str): The name of the reader backend (see `reader_for`)
+            intern (bool or dict): Intern text values? See `__init__`.
+            fail_fast (bool): Stop at the first Excel error? See `__init__`.
+
+        Returns:
+            A list of SheetLoader, matching the source Excel file.
+        """
+        reader = cls.reader_for(path, engine)[1](path)
+        unloaded = set(range(len(reader.sheet_names())))
+        return [SheetLoader(reader, i, stripstr, columnar, intern, fail_fast,
+                            unloaded) for i in sorted(unloaded)]
+
+    @classmethod
+    def iter_sheets(cls, path, stripstr=True, engine=None):
+        """Iterate over the sheets of an Excel file without building them.
+
+        Each sheet is read from the file only when it is reached and is
+        released once the next sheet is requested. Rows are converted as they
+        are read, so no Worksheet or Cell objects are created.
+
+        Args:
+            path (str): The path where to find the Excel file.
+            stripstr (bool): Remove trailing / leading whitespace from text?
+            engine (str): The name of the reader backend (see `reader_for`)
+
+        Yields:
+            A tuple (name, rows) for each sheet, where rows is an iterator
+            over lists of cell values (see `Worksheet.stream`). The rows
+            should be consumed before moving on to the next sheet.
+
+        Raises:
+            TypeError: If the file extension is not supported.
+        """
+        reader_class = cls.reader_for(path, engine)[1]
+
+        def stream_sheet(reader, index):
+            """Read a sheet only once its first row is requested."""
+            yield from reader.rows(index, stripstr)
+
+        with reader_class(path) as reader:
+            for i, name in enumerate(reader.sheet_names()):
+                yield name, stream_sheet(reader, i)
+                reader.release(i)
+
+    @classmethod
+    def iter_rows(cls, path, sheet=0, stripstr=True, engine=None):
+        """Iterate over the rows of one sheet in an Excel file.
+
+        This is the streaming counterpart of `Workbook(path)[sheet]`.
+
+        Args:
+            path (str): The path where to find the Excel file.
+            sheet (str or int): Which sheet to read. Defaults to 0 for the
+                first sheet.
+            stripstr (bool): Remove trailing / leading whitespace from text?
+            engine (str): The name of the reader backend (see `reader_for`)
+
+        Yields:
+            A list of cell values for each row of the sheet.
+
+        Raises:
+            IndexError: Supplied int is out of range
+            KeyError: Supplied str does not match a worksheet name
+            TypeError: If sheet is neither str nor int
+        """
+        if not isinstance(sheet, (int, str)):
+            raise TypeError(sheet)
+        sheets = cls.iter_sheets(path, stripstr, engine)
+        try:
+            for i, (name, rows) in enumerate(sheets):
+                if sheet in (i, name):
+                    yield from rows
+                    return
+        finally:
+            sheets.close()
+        if isinstance(sheet, int):
+            raise IndexError(sheet)
+        raise KeyError(sheet)
+
     def __len__(self):
         """Return the number of sheets in this workbook."""
         return len(self.data)
 
     def __iter__(self):
-        """Return an iter of the sheets."""
-        return iter(self.data)
+        """Return an iter of the sheets, loading any that are pending."""
+        for i in range(len(self.data)):
+            yield self[i]
+
+    def __enter__(self):
+        """Enter a context that closes the file of pending sheets."""
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        """Close the file of pending sheets."""
+        self.close()
+
+    def close(self):
+        """Close the file of the sheets that have not been loaded yet.
+
+        A lazy workbook keeps its file open until every sheet has been
+        loaded. Sheets still pending cannot be loaded after this.
+        """
+        readers = {sheet.reader for sheet in self.data if
+                   isinstance(sheet, SheetLoader)}
+        for reader in readers:
+            reader.close()
 
     def __getitem__(self, key):
         """Get a worksheet from a workbook.
@@ -158,30 +660,247 @@ class Workbook:
             TypeError: If key is neither str nor int
         """
         if isinstance(key, int):
-            return self.data[key]
+            sheet = self.data[key]
+            if isinstance(sheet, SheetLoader):
+                sheet = self.init_sheet(sheet.load())
+                self.data[key] = sheet
+            return sheet
         if isinstance(key, str):
-            for sheet in self:
-                if sheet.name == key:
-                    return sheet
-            raise KeyError(key)
+            return self[self.sheet_position(key)]
         raise TypeError(key)
 
+    def sheet_position(self, name):
+        """Get the index of the sheet with the given name.
+
+        Names are looked up in a dictionary. A hit is checked against the
+        name of the sheet at that index, and the dictionary is rebuilt when
+        the check fails, the name is not found or the number of sheets has
+        changed. This keeps the lookup correct after sheets are added,
+        removed, reordered or renamed.
+
+        Args:
+            name (str): The sheet name
+
+        Returns:
+            The integer index of the first sheet with that name.
+
+        Raises:
+            KeyError: Supplied str does not match a worksheet name
+        """
+        index = self._sheet_index.get(name)
+        if index is None or self._sheet_count != len(self.data) or \
+                self.data[index].name != name:
+            self._sheet_index = {}
+            for i, sheet in enumerate(self.data):
+                self._sheet_index.setdefault(sheet.name, i)
+            self._sheet_count = len(self.data)
+        return self._sheet_index[name]
+
+    def get(self, name, default=None):
+        """Get a worksheet by name, or a default if it is not found.
+
+        Args:
+            name (str): The sheet name
+            default: What to return if there is no sheet with that name
+
+        Returns:
+            The found worksheet or the default.
+        """
+        try:
+            return self[self.sheet_position(name)]
+        except KeyError:
+            return default
+
+    def __contains__(self, name):
+        """Test whether there is a sheet with the given name.
+
+        Sheets are not loaded to answer this.
+        """
+        try:
+            self.sheet_position(name)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+
+class SheetLoader:
+    """Placeholder for a sheet of a Workbook that is not yet converted.
+
+    Instance attributes:
+        reader (readers.Reader): The open reader holding the sheet
+        index (int): The index of the sheet in the file
+        name (str): The name of the sheet
+        stripstr (bool): Remove trailing / leading whitespace from text?
+        columnar (bool): Store the data in a ColumnStore?
+        intern (bool or dict): Intern text values?
+        fail_fast (bool): Stop at the first Excel error?
+        unloaded (set): The indices of the sheets of the reader that are not
+            loaded yet, shared by its loaders, or None
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(self, reader, index, stripstr=True, columnar=False,
+                 intern=None, fail_fast=False, unloaded=None):
+        """Initialize the placeholder without reading the sheet.
+
+        Args:
+            reader (readers.Reader): The open reader holding the sheet
+            index (int): The index of the sheet in the file
+            stripstr (bool): Remove trailing / leading whitespace from text?
+            columnar (bool): Store the data in a ColumnStore?
+            intern (bool or dict): Intern text values? See Workbook.
+            fail_fast (bool): Stop at the first Excel error? See Workbook.
+            unloaded (set): The indices of the sheets of the reader that are
+                not loaded yet, shared by its loaders. The reader is closed
+                when the last of them is loaded. With None, it is left open.
+        """
+        self.reader = reader
+        self.index = index
+        self.name = reader.sheet_names()[index]
+        self.stripstr = stripstr
+        self.columnar = columnar
+        self.intern = intern
+        self.fail_fast = fail_fast
+        self.unloaded = unloaded
+
+    def load(self):
+        """Convert the sheet to a Worksheet and release it from the reader.
+
+        The reader is closed once this is the last of its sheets loaded.
+        """
+        worksheet = self.reader.worksheet(self.index, self.stripstr,
+                                          self.columnar, self.intern,
+                                          self.fail_fast)
+        self.reader.release(self.index)
+        if self.unloaded is not None:
+            self.unloaded.discard(self.index)
+            if not self.unloaded:
+                self.reader.close()
+        return worksheet
+
+    def __repr__(self):
+        """Return formal representation of the SheetLoader."""
+        return '<SheetLoader(name="{}")>'.format(self.name)
+
+
+def clean_whitespace_rows(rows, changes):
+    """Clean the whitespace of the text in rows of cell values.
+
+    Only text can hold extra whitespace, so other values are passed through
+    as they are.
+
+    Args:
+        rows (iterable): The rows, each a list of cell values such as those
+            yielded by `Workbook.iter_sheets`. The lists are changed in place.
+        changes (Counter): Counts the changed cells, by Excel column letter.
+
+    Yields:
+        A tuple (row, highlights) for each row, where highlights maps the
+        column index of every changed cell to 'HL_YELLOW'.
+    """
+    for row in rows:
+        highlights = {}
+        for j, value in enumerate(row):
+            # pylint: disable=unidiomatic-typecheck
+            if type(value) is not str or not value:
+                continue
+            new_value = utils.clean_string(value)
+            if new_value != value:
+                row[j] = new_value
+                highlights[j] = 'HL_YELLOW'
+                changes[utils.number_to_excel_column(j)] += 1
+        yield row, highlights
+
 
 def remove_extra_whitespace(inpath, outpath):
     """Remove trailing and leading whitespace of newlines and text.
 
+    The source file is streamed row by row into the new file, so memory use
+    does not depend on the size of the workbook. Changed cells are
+    highlighted in the new file.
+
     Args:
         inpath (str): The path where to find the source file.
         outpath (str): The path where to write the new xlsxfile.
+
+    Returns:
+        A dictionary from sheet name to a Counter of the changed cells by
+        Excel column letter, for every sheet in order.
     """
-    wb = Workbook(inpath, stripstr=False)
-    for cell in wb.cell_iter():
-        old_value = str(cell)
-        new_value = utils.clean_string(old_value)
-        if old_value != new_value:
-            cell.value = new_value
-            cell.highlight = 'HL_YELLOW'
-    wb.write_out(outpath)
+    summary = {}
+    wb = xlsxwriter.Workbook(outpath, {'constant_memory': True})
+    formats = Workbook.init_formats(wb)
+    try:
+        for sheetname, rows in Workbook.iter_sheets(inpath, stripstr=False):
+            ws = wb.add_worksheet(sheetname)
+            changes = summary[sheetname] = Counter()
+            cleaned = clean_whitespace_rows(rows, changes)
+            for i, (row, highlights) in enumerate(cleaned):
+                Workbook.write_row_values(ws, i, row, highlights, formats)
+    finally:
+        wb.close()
+    return summary
+
+
+def remove_whitespace_many(jobs, workers=None):
+    """Remove extra whitespace from many files, in parallel if requested.
+
+    Args:
+        jobs (sequence): A tuple (inpath, outpath) for each file. See
+            `remove_extra_whitespace`.
+        workers (int): The number of worker processes. The default of None
+            uses the number of processors. With 1, the files are cleaned one
+            by one in this process.
+
+    Yields:
+        The summary of changes returned by `remove_extra_whitespace` for
+        each file, in the order of the input.
+    """
+    jobs = list(jobs)
+    if workers == 1 or len(jobs) <= 1:
+        for inpath, outpath in jobs:
+            yield remove_extra_whitespace(inpath, outpath)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(remove_extra_whitespace, *zip(*jobs))
+
+
+def write_csv_dir(inpath, outdir):
+    """Write every sheet of a workbook to a CSV file in a directory.
+
+    Args:
+        inpath (str): The path where to find the source file.
+        outdir (str): The directory, created if needed
+
+    Returns:
+        A list of the paths written, as from `Workbook.to_csv_dir`.
+    """
+    return Workbook(inpath, lazy=True).to_csv_dir(outdir)
+
+
+def write_csv_dir_many(jobs, workers=None):
+    """Write many workbooks to directories of CSV files, in parallel.
+
+    Each workbook is read and written by a worker process, and only the
+    paths written are sent back.
+
+    Args:
+        jobs (sequence): A tuple (inpath, outdir) for each file. See
+            `write_csv_dir`.
+        workers (int): The number of worker processes. The default of None
+            uses the number of processors. With 1, the files are written one
+            by one in this process.
+
+    Yields:
+        The list of paths written for each file, in the order of the input.
+    """
+    jobs = list(jobs)
+    if workers == 1 or len(jobs) <= 1:
+        for inpath, outdir in jobs:
+            yield write_csv_dir(inpath, outdir)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(write_csv_dir, *zip(*jobs))
 
 
 def write_sheet_to_csv(inpath, outpath, sheet=0):
@@ -193,24 +912,22 @@ def write_sheet_to_csv(inpath, outpath, sheet=0):
         sheet (str): Which sheet to write as CSV. Defaults to 0 for the first
             sheet
     """
-    wb = Workbook(inpath)
-    ws = wb[sheet]
-    ws.to_csv(outpath)
+    rows = Workbook.iter_rows(inpath, sheet)
+    Worksheet.rows_to_csv(rows, outpath)
 
 
-def report_workbook_errors(inpath):
+def report_workbook_errors(inpath, fail_fast=False):
     """Print to screen the errors in the workbook.
 
     Args:
         inpath (str): The path where to find the source file.
+        fail_fast (bool): Stop reading at the first error and raise
+            SpreadsheetError describing it.
     """
-    wb = Workbook(inpath)
-    errors = wb.get_excel_errors()
-    for sheetname in wb.sheetnames():
-        sheet_errors = errors[sheetname]
+    for sheetname, rows in Workbook.iter_sheets(inpath):
+        sheet_errors = Worksheet.rows_excel_errors(rows, sheetname, fail_fast)
         if sheet_errors:
             print(f'Errors in sheet: {sheetname}')
-            sheet_errors = errors[sheetname]
             for key, value in sorted(sheet_errors.items()):
                 cell_names = ', '.join(value)
                 print(f' - {key} -> {cell_names}')
@@ -221,8 +938,9 @@ def workbook_cli():
     prog_desc = 'Utilities for workbooks, depending on the options provided.'
     parser = argparse.ArgumentParser(description=prog_desc)
 
-    file_help = 'Path to source workbook.'
-    parser.add_argument('xlsxfile', help=file_help)
+    file_help = ('Path to source workbook. Several may be given with '
+                 '--whitespace or --csv_dir.')
+    parser.add_argument('xlsxfile', nargs='+', help=file_help)
 
     ws_help = 'Remove trailing and leading whitespace of text and newlines.'
     parser.add_argument('-w', '--whitespace', help=ws_help,
@@ -231,24 +949,67 @@ def workbook_cli():
     csv_help = 'Write a worksheet to CSV. Supply the worksheet name here.'
     parser.add_argument('-c', '--csv', help=csv_help)
 
+    csv_dir_help = ('Write every worksheet to a CSV file in a directory. The '
+                    'directory is the outpath if given, otherwise it is '
+                    'named after the workbook. Several workbooks are '
+                    'written in parallel.')
+    parser.add_argument('-C', '--csv_dir', action='store_true',
+                        help=csv_dir_help)
+
+    workers_help = ('Number of processes used by --whitespace or --csv_dir on '
+                    'several files. Defaults to a number based on the '
+                    'processors.')
+    parser.add_argument('--workers', type=int, help=workers_help)
+
     parser.add_argument('-e', '--errors', action='store_true',
                         help='List out the errors in the workbook.')
 
+    fail_fast_help = ('With --errors, stop at the first error found and exit '
+                      'with an error status.')
+    parser.add_argument('-x', '--fail_fast', action='store_true',
+                        help=fail_fast_help)
+
     out_help = ('Path to write output. If this argument is not supplied, '
                 'then defaults are used.')
     parser.add_argument('-o', '--outpath', help=out_help)
 
     args = parser.parse_args()
 
+    if len(args.xlsxfile) > 1 and not (args.whitespace or args.csv_dir):
+        parser.error('Several source files are only allowed with '
+                     '--whitespace or --csv_dir')
+    if len(args.xlsxfile) > 1 and args.outpath is not None:
+        parser.error('--outpath cannot be used with several source files')
+
     if args.whitespace:
-        filename, extension = os.path.splitext(args.xlsxfile)
         if args.outpath is None:
-            outpath = os.path.join(filename+'-rmws'+extension)
+            outpaths = [utils.excel_outpath(path, '-rmws') for path in
+                        args.xlsxfile]
         else:
-            outpath = args.outpath
-        remove_extra_whitespace(args.xlsxfile, outpath)
-        print('Cleaned whitespace and wrote file to "{}"'.format(outpath))
-    elif args.csv is not None:
+            outpaths = [args.outpath]
+        summaries = remove_whitespace_many(zip(args.xlsxfile, outpaths),
+                                           args.workers)
+        for outpath, summary in zip(outpaths, summaries):
+            print('Cleaned whitespace and wrote file to "{}"'.format(outpath))
+            for sheetname, changes in summary.items():
+                if changes:
+                    columns = sorted(changes, key=lambda col: (len(col), col))
+                    counts = ', '.join(f'{col}: {changes[col]}' for col in
+                                       columns)
+                    print(f' - {sheetname} -> {counts}')
+        return
+    if args.csv_dir and args.csv is None:
+        if args.outpath is None:
+            outdirs = [os.path.splitext(os.path.normpath(path))[0] for path in
+                       args.xlsxfile]
+        else:
+            outdirs = [args.outpath]
+        jobs = zip(args.xlsxfile, outdirs)
+        for outdir, _ in zip(outdirs, write_csv_dir_many(jobs, args.workers)):
+            print('Wrote csv files to "{}"'.format(outdir))
+        return
+    args.xlsxfile = args.xlsxfile[0]
+    if args.csv is not None:
         base = os.path.split(args.xlsxfile)[0]
         sheet_name = args.csv
         if args.outpath is not None:
@@ -261,7 +1022,10 @@ def workbook_cli():
         write_sheet_to_csv(args.xlsxfile, outpath, args.csv)
         print('Wrote csv file to "{}"'.format(outpath))
     elif args.errors:
-        report_workbook_errors(args.xlsxfile)
+        try:
+            report_workbook_errors(args.xlsxfile, args.fail_fast)
+        except SpreadsheetError as err:
+            sys.exit(str(err))
 
 
 if __name__ == '__main__':
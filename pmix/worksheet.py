@@ -1,10 +1,41 @@
 """Module for Worksheet class."""
 from collections import defaultdict
+import copy
 import csv
+import sys
 
-from pmix.cell import Cell
+from pmix.cell import BLANK, Cell, CellError
+from pmix.columnstore import ColumnCell, ColumnStore
 from pmix.error import SpreadsheetError
 from pmix.utils import number_to_excel_column
+from pmix.worksheetview import WorksheetView
+
+
+# Bytes buffered before a CSV file is written to
+CSV_BUFFER_SIZE = 1 << 20
+
+
+def import_numpy(feature):
+    """Import NumPy, which is an optional dependency, when first needed.
+
+    It is not imported with this module so that other uses do not pay for
+    it.
+
+    Args:
+        feature (str): What needs NumPy, for the error message
+
+    Returns:
+        The numpy module.
+
+    Raises:
+        ImportError: If NumPy is not installed
+    """
+    try:
+        # pylint: disable=import-outside-toplevel
+        import numpy
+    except ImportError as err:
+        raise ImportError('NumPy is required for ' + feature) from err
+    return numpy
 
 
 class Worksheet:
@@ -19,27 +50,45 @@ class Worksheet:
 
     count = 0
 
-    def __init__(self, *, data=None, name=None):
+    def __init__(self, *, data=None, name=None, columnar=False):
         """Initialize the Worksheet.
 
         Attributes:
-            data (list): The rows of the worksheet
+            data (list or ColumnStore): The rows of the worksheet
             name (str): The name of the worksheet
+            owned_rows (set): Indices of rows that belong to this worksheet
+                alone. None if no rows are shared with a copy.
+            owned_cells (set): (row, col) positions of cells that belong to
+                this worksheet alone. None if no cells are shared with a copy.
+            version (int): Incremented each time the worksheet may have
+                changed through its methods. Cached indexes record the
+                version they were built for.
 
         Args:
             data: The data. Defaults to None to represent an empty worksheet.
             name (str): The string name of the Worksheet. If not supplied,
                 then a default name is given.
+            columnar (bool): If true, store the data column by column in a
+                ColumnStore instead of a list of rows of Cell.
         """
         if data is None:
             self.data = []
         else:
             self.data = data
+        if columnar and not isinstance(self.data, ColumnStore):
+            self.data = ColumnStore.from_rows(self.data)
         if name is None:
             Worksheet.count += 1
             self.name = 'sheet' + str(Worksheet.count)
         else:
             self.name = name
+        self.owned_rows = None
+        self.owned_cells = None
+        self.version = 0
+        self._headers = None
+        self._header_index = None
+        self._errors = None
+        self._errors_version = None
 
     def dim(self):
         """Return the dimensions of this Worksheet as tuple (nrow, ncol)."""
@@ -52,6 +101,8 @@ class Worksheet:
 
         Checks that all rows have the same length.
         """
+        if self.is_columnar():
+            return self.data.ncol()
         if self:
             lengths = {len(line) for line in self}
             if len(lengths) > 1:
@@ -62,35 +113,193 @@ class Worksheet:
         else:
             return 0
 
+    def is_columnar(self):
+        """Test whether the data is held in a ColumnStore."""
+        return isinstance(self.data, ColumnStore)
+
+    # pylint: disable=too-many-arguments
     @classmethod
-    def from_sheet(cls, sheet, datemode=None, stripstr=True):
+    def from_sheet(cls, sheet, datemode=None, stripstr=True, columnar=False,
+                   intern=None, fail_fast=False):
         """Create Worksheet from xlrd Sheet object.
 
         Args:
             sheet (xlrd.Sheet): A sheet instance to copy over
             datemode (int): The date mode of the Excel workbook
             stripstr (bool): Remove trailing / leading whitespace from text?
+            columnar (bool): Store the data in a ColumnStore?
+            intern (bool or dict): Intern text values? See `from_rows`.
+            fail_fast (bool): Stop at the first Excel error? See `from_rows`.
 
         Returns:
             Worksheet: An initialized Worksheet object
         """
-        worksheet = cls(name=sheet.name)
-        for i in range(sheet.nrows):
-            cur_row = []
-            for j, col in enumerate(sheet.row(i)):
-                try:
-                    cell = Cell.from_cell(col, datemode, stripstr)
-                except TypeError as err:
-                    new_msg = 'Error sheet {} in cell {}{}: {}'
-                    excel_row = i + 1
-                    col_letter = number_to_excel_column(j)
-                    new_msg = new_msg.format(sheet.name, col_letter, excel_row,
-                                             str(err))
-                    raise TypeError(new_msg)
-                cur_row.append(cell)
-            worksheet.data.append(cur_row)
+        rows = cls.stream(sheet, datemode, stripstr)
+        return cls.from_rows(rows, sheet.name, columnar, intern, fail_fast)
+
+    # pylint: disable=too-many-arguments
+    @classmethod
+    def from_rows(cls, rows, name=None, columnar=False, intern=None,
+                  fail_fast=False):
+        """Create Worksheet from rows of cell values.
+
+        Args:
+            rows (iterable): The rows, each a sequence of values such as those
+                yielded by `Worksheet.stream`
+            name (str): The name of the worksheet
+            columnar (bool): Store the data in a ColumnStore?
+            intern (bool or dict): If True or a dict, equal text values share
+                one str object. True uses sys.intern, which shares strings
+                across the whole process. A dict is used as the table of
+                strings, so passing the same dict to several sheets or
+                workbooks shares strings among them only.
+            fail_fast (bool): If true, raise at the first Excel error value
+                instead of building a worksheet that contains it.
+
+        The locations of Excel errors are recorded while the rows are read,
+        for `get_excel_errors`.
+
+        Returns:
+            Worksheet: An initialized Worksheet object
+
+        Raises:
+            SpreadsheetError: If fail_fast is true and an Excel error is
+                found.
+        """
+        errors = []
+        rows = cls.track_errors(rows, errors, name, fail_fast)
+        # An empty table is falsy but still wanted
+        if intern or isinstance(intern, dict):
+            rows = cls.intern_rows(rows, intern)
+        if columnar:
+            worksheet = cls(data=ColumnStore.from_rows(rows), name=name)
+        else:
+            worksheet = cls(name=name)
+            for row in rows:
+                worksheet.data.append([BLANK if value is None else Cell(value)
+                                       for value in row])
+        worksheet.set_error_index(errors)
         return worksheet
 
+    @staticmethod
+    def track_errors(rows, errors, name=None, fail_fast=False):
+        """Iterate over rows, recording where the Excel errors are.
+
+        Only rows that hold a CellError are searched cell by cell, and
+        finding that out takes one pass over the types of the row in C.
+
+        Args:
+            rows (iterable): The rows, each a sequence of values
+            errors (list): Where to append the (row, col) position of every
+                Excel error, in order.
+            name (str): The sheet name, used in error messages
+            fail_fast (bool): Raise at the first Excel error?
+
+        Yields:
+            Each row unchanged.
+
+        Raises:
+            SpreadsheetError: If fail_fast is true and an Excel error is
+                found.
+        """
+        for i, row in enumerate(rows):
+            if CellError in set(map(type, row)):
+                for j, value in enumerate(row):
+                    if not isinstance(value, CellError):
+                        continue
+                    if fail_fast:
+                        msg = 'Excel error {} in sheet {} cell {}{}'
+                        msg = msg.format(value.error_text, name,
+                                         number_to_excel_column(j), i + 1)
+                        raise SpreadsheetError(msg)
+                    errors.append((i, j))
+            yield row
+
+    @staticmethod
+    def intern_rows(rows, table=True):
+        """Iterate over rows with the text values interned.
+
+        Args:
+            rows (iterable): The rows, each a sequence of values
+            table (bool or dict): True to use sys.intern, or a dict from
+                string to the shared instance of that string
+
+        Yields:
+            A list of values for each row, where equal strings are the same
+            object.
+        """
+        if table is True:
+            lookup = sys.intern
+        else:
+            def lookup(value):
+                return table.setdefault(value, value)
+        for row in rows:
+            # sys.intern refuses subclasses of str
+            # pylint: disable=unidiomatic-typecheck
+            yield [lookup(value) if type(value) is str else value for value
+                   in row]
+
+    @staticmethod
+    def stream(sheet, datemode=None, stripstr=True):
+        """Iterate over the converted rows of an xlrd Sheet object.
+
+        No Cell objects are created. This is meant for one pass over a large
+        sheet, where building a Worksheet would cost too much memory.
+
+        Args:
+            sheet (xlrd.Sheet): A sheet instance to read from
+            datemode (int): The date mode of the Excel workbook
+            stripstr (bool): Remove trailing / leading whitespace from text?
+
+        Yields:
+            A list for each row of the sheet. The values are what
+            `Cell.cell_value` produces, converted a row at a time by
+            `Cell.convert_values`.
+        """
+        typed_rows = ((sheet.row_types(i), sheet.row_values(i)) for i in
+                      range(sheet.nrows))
+        return Worksheet.convert_rows(typed_rows, sheet.name, datemode,
+                                      stripstr)
+
+    @staticmethod
+    def convert_rows(typed_rows, name=None, datemode=None, stripstr=True):
+        """Iterate over the converted rows of raw xlrd-style cell data.
+
+        Args:
+            typed_rows (iterable): A (types, values) tuple of sequences for
+                each row, with xlrd cell types and values.
+            name (str): The sheet name, used in error messages
+            datemode (int): The date mode of the Excel workbook
+            stripstr (bool): Remove trailing / leading whitespace from text?
+
+        Yields:
+            A list of converted values for each row (see
+            `Cell.convert_values`).
+
+        Raises:
+            TypeError: If a cell type cannot be converted. The message gives
+                the location of the cell.
+        """
+        for i, (types, values) in enumerate(typed_rows):
+            try:
+                cur_row = Cell.convert_values(types, values, datemode,
+                                              stripstr)
+            except TypeError as err:
+                # Convert cell by cell only to find the offending one
+                j = 0
+                for j, ctype in enumerate(types):
+                    try:
+                        Cell.convert_run(ctype, values[j:j + 1], datemode)
+                    except TypeError:
+                        break
+                new_msg = 'Error sheet {} in cell {}{}: {}'
+                excel_row = i + 1
+                col_letter = number_to_excel_column(j)
+                new_msg = new_msg.format(name, col_letter, excel_row,
+                                         str(err))
+                raise TypeError(new_msg)
+            yield cur_row
+
     def prepend_row(self, row=None):
         """Insert a row as the first row in this sheet.
 
@@ -99,10 +308,10 @@ class Worksheet:
                 of this worksheet.
         """
         if row is None and self.data:
-            new_row = [Cell() for _ in self.data[0]]
+            new_row = [BLANK for _ in self.data[0]]
             self.data.insert(0, new_row)
         elif row is None:
-            self.data.append([Cell()])
+            self.data.append([BLANK])
         elif len(row) != self.ncol():
             msg = 'Worksheet and supplied row width inconsistent ({} vs. {})'
             msg = msg.format(self.ncol(), len(row))
@@ -110,6 +319,12 @@ class Worksheet:
         else:
             new_row = [c if isinstance(c, Cell) else Cell(c) for c in row]
             self.data.insert(0, new_row)
+        self.version += 1
+        self.invalidate_headers()
+        if self.owned_rows is not None:
+            self.owned_rows = {i + 1 for i in self.owned_rows}
+            self.owned_rows.add(0)
+            self.owned_cells = {(i + 1, j) for i, j in self.owned_cells}
 
     def append_col(self, header=None):
         """Append a column to the end of the worksheet.
@@ -117,21 +332,163 @@ class Worksheet:
         Args:
             header: The optional header for the column
         """
-        for i, row in enumerate(self):
-            if i == 0:
+        self.version += 1
+        self.invalidate_headers()
+        if self.is_columnar():
+            if self.data:
+                values = [None] * len(self.data)
+                values[0] = header
+                self.data.append_column(values)
+            return
+        for i in range(len(self)):
+            row = self.writable_row_list(i)
+            if i == 0 and header is not None:
                 row.append(Cell(header))
             else:
-                row.append(Cell())
+                row.append(BLANK)
+
+    def writable_cell(self, row, col):
+        """Get the cell at a position, ready to be written to.
+
+        Blank positions hold the shared, read-only BLANK cell. It is
+        replaced with a Cell of its own here, so that it can be written to or
+        highlighted. Likewise, a row or cell shared with a copy of this
+        worksheet (see `copy`) is cloned before it is handed out.
+
+        Args:
+            row (int): The row index
+            col (int): The column index
+
+        Returns:
+            The Cell stored at the position.
+        """
+        self.version += 1
+        if self.data and row % len(self.data) == 0:
+            self.invalidate_headers()
+        if self.is_columnar():
+            return self.data[row][col]
+        cells = self.writable_row_list(row)
+        cell = cells[col]
+        if cell is BLANK:
+            cell = Cell()
+            cells[col] = cell
+        elif self.owned_cells is not None:
+            position = (row % len(self.data), col % len(cells))
+            if position not in self.owned_cells:
+                cell = copy.copy(cell)
+                cells[col] = cell
+                self.owned_cells.add(position)
+        return cell
+
+    def writable_row_list(self, row):
+        """Get the list of cells for a row, ready for the list to change.
+
+        If the row list is shared with a copy of this worksheet, then it is
+        cloned first. The cells in it may still be shared.
+
+        Args:
+            row (int): The row index
+
+        Returns:
+            The list of Cells for the row.
+        """
+        cells = self.data[row]
+        if self.owned_rows is not None:
+            row = row % len(self.data)
+            if row not in self.owned_rows:
+                cells = list(cells)
+                self.data[row] = cells
+                self.owned_rows.add(row)
+        return cells
+
+    def copy(self):
+        """Make a copy of this worksheet that shares its rows and cells.
+
+        Nothing is cloned up front. Afterwards, both this worksheet and the
+        copy clone a row or a cell the first time it is changed through
+        `writable_cell` (or the methods based on it), so that changes made to
+        one are not seen in the other. Writing directly to a non-blank
+        Cell object would change both.
+
+        Data in a ColumnStore is copied column by column instead, which costs
+        one list copy per column and no Cell objects.
+
+        Returns:
+            A new worksheet of the same class.
+        """
+        result = copy.copy(self)
+        if self.is_columnar():
+            result.data = self.data.copy()
+        else:
+            result.data = list(self.data)
+            for sheet in (self, result):
+                sheet.owned_rows = set()
+                sheet.owned_cells = set()
+        return result
+
+    def writable_row(self, row):
+        """Get the cells of a row, ready to be written to.
+
+        Args:
+            row (int): The row index
+
+        Returns:
+            A list of the Cells in the row. See `writable_cell`.
+        """
+        return [self.writable_cell(row, j) for j in range(len(self[row]))]
+
+    def writable_column(self, key, start=0):
+        """Iterate over the cells of a column, ready to be written to.
+
+        Args:
+            key (str or int): Str for lookup by name, int for lookup by index
+            start (int): The row to start iterating on
+
+        Yields:
+            The Cells in the requested column. See `writable_cell`.
+        """
+        col = self.column_key(key)[0]
+        for i in range(max(start, 0), len(self)):
+            yield self.writable_cell(i, col)
 
     def column_headers(self):
         """Get the column headers for this worksheet.
 
+        The headers are cached until `invalidate_headers` is called. This
+        happens in prepend_row, append_col and writable_cell (for the first
+        row). Code that changes header cells by other means should call
+        `invalidate_headers` itself.
+
         Returns:
             A tuple of the column headers as strings
         """
-        if self.data:
-            return tuple(str(i) for i in self.data[0])
-        return ()
+        if self._headers is None:
+            if self.data:
+                self._headers = tuple(str(i) for i in self.data[0])
+            else:
+                self._headers = ()
+        return self._headers
+
+    def header_index(self):
+        """Get a map from column header to column index.
+
+        If a header is repeated, the first column with it is used. The map is
+        cached along with the column headers.
+
+        Returns:
+            A dictionary with header strings as keys and integers as values.
+        """
+        if self._header_index is None:
+            header_index = {}
+            for i, header in enumerate(self.column_headers()):
+                header_index.setdefault(header, i)
+            self._header_index = header_index
+        return self._header_index
+
+    def invalidate_headers(self):
+        """Clear the cached column headers and header index."""
+        self._headers = None
+        self._header_index = None
 
     def column_pairs(self, indices=None, base=None, start=0):
         """Iterate over pairs within the same row for all rows.
@@ -144,6 +501,7 @@ class Worksheet:
                 base/reference for pairs, or a string to match the column
                 header. Default of None means to use the first of `indices`.
                 This integer should be in `indices` if both are supplied.
+                Headers are looked up as in `column_key`.
             start (int): Which row to start yielding with. Defaults to 0,
                 meaning iterate over all rows.
 
@@ -151,28 +509,25 @@ class Worksheet:
             Yields the pairs from the start row to the end of the sheet. They
             are of the form (BaseData, OtherData) and the data is stored in a
             CellData named tuple.
+
+        Raises:
+            KeyError: If a header is not found
         """
         headers = self.column_headers()
         if indices is None:
             indices = list(range(self.ncol()))
         else:
-            result = []
-            for i in indices:
-                item = i if isinstance(i, int) else headers.index(i)
-                if item not in result:
-                    result.append(item)
-            indices = result
+            indices = list(dict.fromkeys(self.column_key(list(indices))))
         if not indices:
             return
         if base is None:
             base = indices.pop(0)
         else:
-            base = base if isinstance(base, int) else headers.index(base)
+            base = self.column_key(base)[0]
             if base in indices:
                 indices.remove(base)
-        for i, row in enumerate(self):
-            if i < start:
-                continue
+        for i in range(start, len(self.data)):
+            row = self.data[i]
             base_data = {
                 'row': i,
                 'col': base,
@@ -188,6 +543,34 @@ class Worksheet:
                 }
                 yield base_data, other_data
 
+    def view(self, rows=None, cols=None):
+        """Get a view on a range of rows and a subset of columns.
+
+        The view copies nothing and sees changes to the cells.
+
+        Args:
+            rows (range or slice): The rows to include. Defaults to None for
+                all rows.
+            cols (sequence): The columns to include, in order, each an int or
+                a header str. Defaults to None for all columns.
+
+        Returns:
+            WorksheetView: The view
+        """
+        return WorksheetView(self, rows, cols)
+
+    def body(self, cols=None):
+        """Get a view on the rows after the header row.
+
+        Args:
+            cols (sequence): The columns to include, in order, each an int or
+                a header str. Defaults to None for all columns.
+
+        Returns:
+            WorksheetView: The view
+        """
+        return WorksheetView(self, slice(1, None), cols)
+
     def column_key(self, key):
         """Return a list of integers corresponding to the input.
 
@@ -198,17 +581,13 @@ class Worksheet:
         Returns:
             A list of integers.
         """
-        column_headers = self.column_headers()
+        header_index = self.header_index()
         if isinstance(key, (int, str)):
             key = [key]
         result = []
         for item in key:
             if isinstance(item, str):
-                try:
-                    col = column_headers.index(item)
-                    result.append(col)
-                except ValueError:
-                    raise KeyError(item)
+                result.append(header_index[item])
             elif isinstance(item, int):
                 result.append(item)
             else:
@@ -232,11 +611,28 @@ class Worksheet:
         """
         cols = self.column_key(key)
         col = cols[0]
-        for row in self:
-            if start <= 0:
-                yield row[col]
-            else:
-                start -= 1
+        if self.is_columnar():
+            for i in range(max(start, 0), len(self.data)):
+                yield ColumnCell(self.data, i, col)
+            return
+        for row in self.view(rows=slice(max(start, 0), None)):
+            yield row[col]
+
+    def column_values(self, key, start=0):
+        """Get the values of the desired column.
+
+        Args:
+            key (str or int): Str for lookup by name, int for lookup by index
+            start (int): The row to start with
+
+        Returns:
+            A new list of the cell values in the requested column from the
+            start row to the last
+        """
+        if self.is_columnar():
+            col = self.column_key(key)[0]
+            return self.data.column(col)[max(start, 0):]
+        return [cell.value for cell in self.column(key, start)]
 
     def column_str(self, key, start=0):
         """Iterate over the desired column cell by cell and return the string.
@@ -249,8 +645,49 @@ class Worksheet:
             The cell strings in the requested column from the start row to the
             last
         """
-        for cell in self.column(key, start):
-            yield str(cell)
+        for value in self.column_values(key, start):
+            yield '' if value is None else str(value)
+
+    def column_array(self, key, dtype=object, start=1):
+        """Get a column as a NumPy masked array.
+
+        Blank cells (empty, '' or an Excel error) are masked. Their data is
+        0 for numeric dtypes and '' otherwise. NumPy is an optional
+        dependency, needed only here.
+
+        Args:
+            key (str or int): Str for lookup by name, int for lookup by index
+            dtype: The NumPy dtype of the array. With object, the cell values
+                are kept as is. With a unicode dtype (or str), the cell
+                strings are used. Other dtypes are converted by NumPy.
+            start (int): The row to start with. Defaults to 1 to skip the
+                header row.
+
+        Returns:
+            numpy.ma.MaskedArray: The column values, with blanks masked.
+
+        Raises:
+            ImportError: If NumPy is not installed
+            ValueError: If a value cannot be converted to the dtype
+        """
+        numpy = import_numpy('Worksheet.column_array')
+        values = self.column_values(key, start)
+        mask = numpy.fromiter(
+            (value is None or value == '' or isinstance(value, CellError) for
+             value in values), dtype=bool, count=len(values)
+        )
+        dtype = numpy.dtype(dtype)
+        if dtype.kind == 'O':
+            data = numpy.empty(len(values), dtype=object)
+            data[:] = values
+        elif dtype.kind == 'U':
+            data = numpy.array(['' if blank else str(value) for value, blank in
+                                zip(values, mask)], dtype=dtype)
+        else:
+            fill = '' if dtype.kind == 'S' else 0
+            data = numpy.array([fill if blank else value for value, blank in
+                                zip(values, mask)], dtype=dtype)
+        return numpy.ma.MaskedArray(data, mask=mask)
 
     def to_csv(self, path, strings=True):
         """Write this Worksheet as a CSV.
@@ -260,20 +697,84 @@ class Worksheet:
             strings (bool): False if the original value should be written,
                 otherwise the string value of the cell is used.
         """
-        with open(path, 'w', newline='', encoding='utf-8') as csv_file:
-            csv_writer = csv.writer(csv_file)
+        self.rows_to_csv(self.row_values(), path, strings)
+
+    @staticmethod
+    def rows_to_csv(rows, path, strings=True):
+        """Write rows of cell values as a CSV.
+
+        Args:
+            rows (iterable): The rows to write, each a sequence of values
+                such as those yielded by `Worksheet.stream`
+            path (str): The path where to write the CSV
+            strings (bool): False if the original value should be written,
+                otherwise the string value of the cell is used.
+        """
+        if strings:
+            rows = (['' if v is None else str(v) for v in row] for row in rows)
+        with open(path, 'w', newline='', encoding='utf-8',
+                  buffering=CSV_BUFFER_SIZE) as csv_file:
+            csv.writer(csv_file).writerows(rows)
+
+    def row_values(self):
+        """Iterate over the rows of this worksheet as lists of values."""
+        if self.is_columnar():
+            for i in range(len(self.data)):
+                yield self.data.row_values(i)
+        else:
+            for row in self:
+                yield [cell.value for cell in row]
+
+    def row_highlights(self):
+        """Iterate over the highlights of the rows of this worksheet.
+
+        Yields:
+            A dictionary for each row, mapping column index to highlight
+            color for the highlighted cells only.
+        """
+        if self.is_columnar():
+            by_row = defaultdict(dict)
+            for (i, j), color in self.data.highlights.items():
+                by_row[i][j] = color
+            for i in range(len(self.data)):
+                yield by_row.get(i, {})
+        else:
             for row in self:
-                if strings:
-                    values = [str(cell) for cell in row]
-                else:
-                    values = [cell.value for cell in row]
-                csv_writer.writerow(values)
+                yield {j: cell.highlight for j, cell in enumerate(row) if
+                       cell.highlight is not None}
 
     def cell_iter(self):
         """Iterate over the cells of a worksheet."""
         for row in self:
             yield from row
 
+    def set_error_index(self, errors):
+        """Store the positions of the Excel errors for the current version.
+
+        Args:
+            errors (list): The (row, col) position of every Excel error, in
+                row-major order.
+        """
+        self._errors = errors
+        self._errors_version = self.version
+
+    def error_positions(self):
+        """Get the positions of the Excel errors in this worksheet.
+
+        The positions are recorded when the worksheet is loaded. The sheet
+        is searched again only after it has been changed through its methods
+        (see `version`).
+
+        Returns:
+            A list of (row, col) tuples, in row-major order.
+        """
+        if self._errors is None or self._errors_version != self.version:
+            errors = []
+            for _ in self.track_errors(self.row_values(), errors):
+                pass
+            self.set_error_index(errors)
+        return self._errors
+
     def get_excel_errors(self):
         """Get all Excel errors in this worksheet.
 
@@ -282,12 +783,38 @@ class Worksheet:
             locations.
         """
         errors = defaultdict(list)
-        for i, row in enumerate(self):
-            for j, cell in enumerate(row):
-                if cell.is_error():
-                    error_text = cell.value.error_text
-                    location = f'{number_to_excel_column(j)}{i+1}'
-                    errors[error_text].append(location)
+        for i, j in self.error_positions():
+            value = self.data[i][j].value
+            location = f'{number_to_excel_column(j)}{i+1}'
+            errors[value.error_text].append(location)
+        return errors
+
+    @staticmethod
+    def rows_excel_errors(rows, name=None, fail_fast=False):
+        """Get all Excel errors in rows of cell values.
+
+        Args:
+            rows (iterable): The rows to search, each a sequence of values
+                such as those yielded by `Worksheet.stream`
+            name (str): The sheet name, used in error messages
+            fail_fast (bool): Raise at the first Excel error?
+
+        Returns:
+            A dictionary with error text as keys and values as lists of cell
+            locations.
+
+        Raises:
+            SpreadsheetError: If fail_fast is true and an Excel error is
+                found.
+        """
+        errors = defaultdict(list)
+        positions = []
+        rows = Worksheet.track_errors(rows, positions, name, fail_fast)
+        for i, row in enumerate(rows):
+            for _, j in positions:
+                location = f'{number_to_excel_column(j)}{i+1}'
+                errors[row[j].error_text].append(location)
+            positions.clear()
         return errors
 
     def __iter__(self):
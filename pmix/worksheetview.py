@@ -0,0 +1,144 @@
+"""Module for views on the rows and columns of a Worksheet."""
+
+
+class RowView:
+    """A view on some of the cells of a row, in a given column order.
+
+    Instance attributes:
+        row (sequence): The row of the worksheet
+        cols (tuple): The column indices in the row
+    """
+
+    def __init__(self, row, cols):
+        """Initialize the row view.
+
+        Args:
+            row (sequence): The row of the worksheet
+            cols (tuple): The column indices in the row
+        """
+        self.row = row
+        self.cols = cols
+
+    def __len__(self):
+        """Return the number of columns in the view."""
+        return len(self.cols)
+
+    def __getitem__(self, key):
+        """Return the cell at index key (int) or a list of cells (slice)."""
+        if isinstance(key, slice):
+            return [self.row[col] for col in self.cols[key]]
+        return self.row[self.cols[key]]
+
+    def __iter__(self):
+        """Return an iterator on the cells of the view."""
+        row = self.row
+        for col in self.cols:
+            yield row[col]
+
+    def __eq__(self, other):
+        """Compare cell by cell with another row."""
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+    def __repr__(self):
+        """Return a representation of the row view."""
+        return repr(list(self))
+
+
+class WorksheetView:
+    """A view on a range of rows and a subset of columns of a Worksheet.
+
+    A view refers to the data of its worksheet and copies nothing, so
+    changes to cells are seen through it. The range of rows is fixed when
+    the view is created: rows inserted into the worksheet afterwards shift
+    what the view shows.
+
+    Instance attributes:
+        worksheet (Worksheet): The worksheet viewed
+        rows (range): The indices of the rows in the worksheet
+        cols (tuple): The indices of the columns in the worksheet, or None
+            for all columns. Rows are given as is when this is None, and as
+            RowView otherwise.
+    """
+
+    def __init__(self, worksheet, rows=None, cols=None):
+        """Initialize the view.
+
+        Args:
+            worksheet (Worksheet): The worksheet to view
+            rows (range or slice): The rows to include. Defaults to None for
+                all rows.
+            cols (sequence): The columns to include, in order, each an int or
+                a header str. Defaults to None for all columns.
+        """
+        self.worksheet = worksheet
+        if rows is None:
+            rows = range(len(worksheet))
+        elif isinstance(rows, slice):
+            rows = range(len(worksheet))[rows]
+        self.rows = rows
+        self.cols = None if cols is None else tuple(worksheet.column_key(cols))
+
+    def view(self, rows=None, cols=None):
+        """Make a view on part of this view.
+
+        Args:
+            rows (slice): Positions of rows within this view. Defaults to
+                None for all rows.
+            cols (sequence): Positions of columns within this view, or header
+                strings. Defaults to None for all columns.
+
+        Returns:
+            WorksheetView: A view on the same worksheet
+        """
+        rows = self.rows if rows is None else self.rows[rows]
+        result = WorksheetView(self.worksheet, rows)
+        result.cols = self.cols
+        if cols is not None:
+            if isinstance(cols, (int, str)):
+                cols = [cols]
+            result.cols = tuple(
+                self.worksheet.column_key(col)[0] if isinstance(col, str) or
+                self.cols is None else self.cols[col] for col in cols
+            )
+        return result
+
+    def items(self):
+        """Iterate over the rows with their index in the worksheet.
+
+        Yields:
+            A tuple (index, row) for each row in the view.
+        """
+        data = self.worksheet.data
+        cols = self.cols
+        for i in self.rows:
+            yield i, data[i] if cols is None else RowView(data[i], cols)
+
+    def ncol(self):
+        """Return the number of columns in the view."""
+        if self.cols is None:
+            return self.worksheet.ncol()
+        return len(self.cols)
+
+    def __len__(self):
+        """Return the number of rows in the view."""
+        return len(self.rows)
+
+    def __getitem__(self, key):
+        """Return the row at index key (int) or a sub-view (slice)."""
+        if isinstance(key, slice):
+            return self.view(rows=key)
+        row = self.worksheet.data[self.rows[key]]
+        return row if self.cols is None else RowView(row, self.cols)
+
+    def __iter__(self):
+        """Return an iterator on the rows of the view."""
+        for _, row in self.items():
+            yield row
+
+    def __repr__(self):
+        """Return a representation of the view."""
+        msg = '<WorksheetView(name="{}", rows={}, cols={})>'
+        return msg.format(self.worksheet.name, self.rows, self.cols)
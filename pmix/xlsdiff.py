@@ -32,7 +32,6 @@ CellDiff
 import argparse
 from collections import defaultdict, Counter, namedtuple
 import difflib
-import os.path
 
 from pmix import utils
 import pmix.workbook
@@ -56,7 +55,7 @@ def indexed_venn(seq1, seq2):
     lists are created.
 
     The items in the input sequences must be hashable, since they are counted
-    and retrieved via list.index().
+    and looked up in dictionaries.
 
     Args:
         seq1 (list): The first sequence
@@ -76,6 +75,11 @@ def indexed_venn(seq1, seq2):
         common_a_dup = []
         a_not_b = []
         a_to_b = {}
+        # First position of each common item in seq_b, as seq_b.index gives
+        b_index = {}
+        for j, item in enumerate(seq_b):
+            if item in common:
+                b_index.setdefault(item, j)
         for i, item in enumerate(seq_a):
             if item in common:
                 appearance_count = counted[item]
@@ -83,8 +87,7 @@ def indexed_venn(seq1, seq2):
                     common_a_dup.append((i, item))
                 else:
                     common_a.append((i, item))
-                    seq_b_ind = seq_b.index(item)
-                    a_to_b[i] = seq_b_ind
+                    a_to_b[i] = b_index[item]
             else:
                 a_not_b.append((i, item))
         return common_a, common_a_dup, a_not_b, a_to_b
@@ -151,7 +154,7 @@ class XlsDiff:
             self._find_cell_diffs(base_sheet, new_sheet)
 
     @classmethod
-    def from_file(cls, base, new, simple, **kwargs):
+    def from_file(cls, base, new, simple, cache=False, **kwargs):
         """Initialize XlsDiff from files.
 
         Creates XlsForm objects and returns their diff.
@@ -160,10 +163,15 @@ class XlsDiff:
             base (str): A path to an xlsform
             new (str): A path to an xlsform
             simple (bool): True if this should be a simple diff
+            cache (bool): Use the on-disk cache of parsed files?
             **kwargs: Anything in kwargs updates the sheet_diff_key map
         """
-        base_xlsform = pmix.workbook.Workbook(base, stripstr=False)
-        new_xlsform = pmix.workbook.Workbook(new, stripstr=False)
+        # Equal text in both files is one object, so comparing it is cheap
+        strings = {}
+        base_xlsform = pmix.workbook.Workbook(base, stripstr=False,
+                                              cache=cache, intern=strings)
+        new_xlsform = pmix.workbook.Workbook(new, stripstr=False, cache=cache,
+                                             intern=strings)
         xls_diff = cls(base_xlsform, new_xlsform, simple, **kwargs)
         return xls_diff
 
@@ -256,11 +264,16 @@ class XlsDiff:
         rows_base_to_new = self.row_venn[sheet_name].a_to_b
         cols_base_to_new = self.col_venn[sheet_name].a_to_b
         for row in common_rows_base:
+            base_cells = base_sheet[row[0]]
+            new_row = rows_base_to_new[row[0]]
+            new_cells = new_sheet[new_row]
             for col in common_cols_base:
-                base_cell = base_sheet[row[0]][col[0]]
-                new_row = rows_base_to_new[row[0]]
+                base_cell = base_cells[col[0]]
                 new_col = cols_base_to_new[col[0]]
-                new_cell = new_sheet[new_row][new_col]
+                new_cell = new_cells[new_col]
+                # Shared blank cells and interned text are the same object
+                if base_cell.value is new_cell.value:
+                    continue
                 if base_cell != new_cell:
                     record = CellDiff(base_cell, new_cell, row[0], col[0],
                                       new_row, new_col, row[1], col[1])
@@ -282,7 +295,7 @@ class XlsDiff:
         """
         diff = self.copy()
         diff.highlight_all()
-        diff.new.write_out(path)
+        diff.new.write_out(path, constant_memory=True)
 
     def highlight_all(self):
         """Make all highlights for the diff."""
@@ -294,34 +307,36 @@ class XlsDiff:
         """Highlight duplicate and new columns."""
         for sheet, venn in self.col_venn.items():
             for col in venn.b_not_a:
-                for cell in self.new[sheet].column(col[0]):
+                for cell in self.new[sheet].writable_column(col[0]):
                     cell.set_highlight('HL_ORANGE')
             for col in venn.common_b_dup:
-                for cell in self.new[sheet].column(col[0]):
+                for cell in self.new[sheet].writable_column(col[0]):
                     cell.set_highlight('HL_RED')
 
     def _highlight_rows_new(self):
         """Highlight duplicate, mis-ordered, and new rows."""
         for sheet, venn in self.row_venn.items():
             for row in venn.b_not_a:
-                for cell in self.new[sheet][row[0]]:
+                for cell in self.new[sheet].writable_row(row[0]):
                     cell.set_highlight('HL_ORANGE')
             for row in venn.common_b_dup:
-                for cell in self.new[sheet][row[0]]:
+                for cell in self.new[sheet].writable_row(row[0]):
                     cell.set_highlight('HL_RED')
             mapping = sorted((k, v) for (k, v) in venn.a_to_b.items())
             old = 0
             for ind in (a_to_b[1] for a_to_b in mapping):
                 if ind < old:
-                    for cell in self.new[sheet][ind]:
+                    for cell in self.new[sheet].writable_row(ind):
                         cell.set_highlight('HL_GREEN')
                 old = ind
 
     def _highlight_cell_diffs_new(self):
         """Highlight cell differences."""
-        for _, diffs in self.cell_diff.items():
+        for sheet, diffs in self.cell_diff.items():
             for cell_diff in diffs:
-                cell_diff.cell_b.set_highlight()
+                cell = self.new[sheet].writable_cell(cell_diff.row_b,
+                                                     cell_diff.col_b)
+                cell.set_highlight()
 
     def report_overview(self):
         """Report an overview of the differences based on indexed Venns."""
@@ -417,19 +432,20 @@ def xlsdiff_cli():
                 'argument then default out path is used. If flag is omitted, '
                 'then write text output to STDOUT.')
     parser.add_argument('-e', '--excel', help=out_help, nargs='?', const=0)
+    cache_help = 'Reuse parsed files from the on-disk cache (~/.cache/pmix).'
+    parser.add_argument('--cache', action='store_true', help=cache_help)
     args = parser.parse_args()
     file1, file2 = args.xlsxfile
     if args.reverse:
         file1, file2 = file2, file1
-    diff = XlsDiff.from_file(file1, file2, args.simple)
+    diff = XlsDiff.from_file(file1, file2, args.simple, args.cache)
     diff.report_overview()
     if args.excel is None:
         diff.report_cell_diffs()
     elif isinstance(args.excel, str):
         diff.write_diff(args.excel)
     else:
-        filename, extension = os.path.splitext(file2)
-        outpath = os.path.join(filename+'-diff'+extension)
+        outpath = utils.excel_outpath(file2, '-diff')
         diff.write_diff(outpath)
 
 
@@ -1,10 +1,47 @@
 """Module defining Xlsform class to work with ODK XLSForms."""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import itertools
+import os
 from typing import List, Optional
 
-from pmix.xlstab import Xlstab
+from pmix.cell import Cell
+from pmix.xlstab import TranslationLayout, Xlstab
 from pmix.workbook import Workbook
 
 
+XlsformMetadata = namedtuple('XlsformMetadata', [
+    'form_id', 'form_title', 'version', 'settings_language', 'form_language',
+    'settings'
+])
+
+XlsformProbe = namedtuple('XlsformProbe', [
+    'path', 'sheetnames', 'metadata', 'error'
+])
+
+
+def probe_one(cls, path, engine):
+    """Probe a single file, capturing any error.
+
+    This is a module-level function so that it can be sent to worker
+    processes.
+
+    Args:
+        cls (type): Xlsform or a subclass
+        path (str): The path to the file
+        engine (str): The name of the reader backend. See Workbook.
+
+    Returns:
+        XlsformProbe: With either the sheet names and metadata or the error
+        set.
+    """
+    try:
+        return cls.probe(path, engine)
+    # pylint: disable=broad-except
+    except Exception as err:
+        return XlsformProbe(path, None, None, err)
+
+
 class Xlsform(Workbook):
     """Class to represent an Xlsform spreadsheet.
 
@@ -15,31 +52,181 @@ class Xlsform(Workbook):
     Note: Analogously, the Xlstab class extends the Worksheet class.
     """
 
-    def __init__(self, path: str, stripstr: bool = True):
+    # pylint: disable=too-many-arguments
+    def __init__(self, path: str, stripstr: bool = True, lazy: bool = False,
+                 columnar: bool = False, cache=None, engine: str = None,
+                 intern=None, fail_fast: bool = False, sheets=None):
         """Initialize workbook and cache Xlsform-specific info.
 
         Args:
             path: The path where to find the Xlsform file.
             stripstr: Remove trailing / leading whitespace from text?
+            lazy: Convert a sheet only the first time it is accessed?
+            columnar: Store sheet data column by column?
+            cache: True or a WorkbookCache to reuse converted values of an
+                unchanged file. See Workbook.
+            engine: The name of the reader backend. See Workbook.
+            intern: True or a dict to share equal text values. See
+                Workbook.
+            fail_fast: Raise at the first Excel error value? See Workbook.
+            sheets: Converted values to use instead of reading the file. See
+                Workbook.
         """
-        super().__init__(path, stripstr)
-        self.data = [Xlstab.from_worksheet(ws) for ws in self]
+        super().__init__(path, stripstr, lazy, columnar, cache, engine,
+                         intern, fail_fast, sheets)
         self.settings = {}
+        self._settings_source = None
         self.init_settings()
 
+    @staticmethod
+    def init_sheet(worksheet):
+        """Wrap a newly converted worksheet as an Xlstab."""
+        return Xlstab.from_worksheet(worksheet)
+
     def init_settings(self):
         """Get settings from Xlsform.
 
+        The settings are read again only if the settings tab has been
+        replaced or changed through its methods (see `Worksheet.version`)
+        since they were last read.
+
         Post-condition: the Xlsform's settings are stored in the instance.
         """
-        try:
-            local_settings = self['settings']
-            headers = local_settings[0]
-            values = local_settings[1]
-            self.settings = {str(k): str(v) for k, v in zip(headers, values) if
-                             not k.is_blank() and not v.is_blank()}
-        except (KeyError, IndexError):
+        local_settings = self.get('settings')
+        version = None if local_settings is None else local_settings.version
+        source = self._settings_source
+        if source is not None and source[0] is local_settings and \
+                source[1] == version:
+            return
+        self._settings_source = (local_settings, version)
+        if local_settings is None or len(local_settings) < 2:
             self.settings = {}
+            return
+        self.settings = self.settings_from_row(local_settings[0],
+                                               local_settings[1])
+
+    @staticmethod
+    def settings_from_row(headers, values):
+        """Make the settings dictionary from the first two settings rows.
+
+        Args:
+            headers (sequence of Cell): The header row
+            values (sequence of Cell): The row of values
+
+        Returns:
+            A dictionary from setting name to value, as str, for the columns
+            where both are not blank.
+        """
+        return {str(k): str(v) for k, v in zip(headers, values) if
+                not k.is_blank() and not v.is_blank()}
+
+    @classmethod
+    def probe(cls, path: str, engine: str = None) -> XlsformProbe:
+        """Read the metadata of a form without loading it.
+
+        Only the sheet names, the first two rows of the settings tab and the
+        header row of the survey tab are read. The .xlsx reader stops
+        parsing those sheets after the rows it needs.
+
+        Args:
+            path: The path to the Xlsform file
+            engine: The name of the reader backend. See Workbook.
+
+        Returns:
+            XlsformProbe: The path, the sheet names, the metadata as from
+            `metadata` and an error of None.
+        """
+        with cls.reader_for(path, engine)[1](path) as reader:
+            sheetnames = tuple(reader.sheet_names())
+            settings = {}
+            if 'settings' in sheetnames:
+                rows = reader.head(sheetnames.index('settings'), 2)
+                if len(rows) == 2:
+                    headers, values = ([Cell(v) for v in row] for row in rows)
+                    settings = cls.settings_from_row(headers, values)
+            language = settings.get('default_language')
+            if language is None and 'survey' in sheetnames:
+                rows = reader.head(sheetnames.index('survey'), 1)
+                headers = [str(Cell(v)) for v in rows[0]] if rows else []
+                layout = TranslationLayout(headers, Xlstab.SURVEY_TRANSLATIONS)
+                language = next(iter(layout.languages), None)
+        metadata = XlsformMetadata(
+            form_id=settings.get('form_id'),
+            form_title=settings.get('form_title'),
+            version=settings.get('version'),
+            settings_language=settings.get('default_language'),
+            form_language=language,
+            settings=settings
+        )
+        return XlsformProbe(path, sheetnames, metadata, None)
+
+    @classmethod
+    def probe_many(cls, paths, workers=None, engine=None):
+        """Probe many files, in parallel if requested.
+
+        Args:
+            paths (sequence of str): The paths to the files
+            workers (int): The number of worker processes. The default of
+                None uses the number of processors. With 1, the files are
+                probed one by one in this process.
+            engine (str): The name of the reader backend. See Workbook.
+
+        Yields:
+            An XlsformProbe for each path, in the order of the input. If a
+            file cannot be read, its sheet names and metadata are None and
+            the exception is in `error`.
+        """
+        paths = list(paths)
+        if workers == 1 or len(paths) <= 1:
+            for path in paths:
+                yield probe_one(cls, path, engine)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            yield from executor.map(probe_one, itertools.repeat(cls), paths,
+                                    itertools.repeat(engine), chunksize=16)
+
+    @classmethod
+    def probe_dir(cls, directory, workers=None, extensions=('.xls', '.xlsx')):
+        """Probe every form in a directory tree, in parallel if requested.
+
+        Excel lock files (starting with "~$") are skipped.
+
+        Args:
+            directory (str): The directory to search, with subdirectories
+            workers (int): The number of worker processes. See `probe_many`.
+            extensions (sequence of str): The extensions of the files to
+                probe.
+
+        Returns:
+            A list of XlsformProbe, one per file, sorted by path.
+        """
+        paths = []
+        for root, _, files in os.walk(directory):
+            paths.extend(os.path.join(root, name) for name in files if
+                         os.path.splitext(name)[1] in extensions and
+                         not name.startswith('~$'))
+        return list(cls.probe_many(sorted(paths), workers))
+
+    def metadata(self) -> XlsformMetadata:
+        """Return the values derived from the settings, all at once.
+
+        Settings that are missing are None. The form language falls back to
+        the survey tab, as in `form_language`.
+
+        Returns:
+            XlsformMetadata: The form id, form title, version, settings
+            language, form language and a copy of the settings dictionary.
+        """
+        self.init_settings()
+        settings = self.settings
+        return XlsformMetadata(
+            form_id=settings.get('form_id'),
+            form_title=settings.get('form_title'),
+            version=settings.get('version'),
+            settings_language=settings.get('default_language'),
+            form_language=self.form_language,
+            settings=dict(settings)
+        )
 
     @property
     def form_id(self) -> str:
@@ -79,11 +266,7 @@ class Xlsform(Workbook):
         """
         language = self.settings_language
         if language is None:
-            try:
-                language = self.survey_languages[0]
-            except KeyError:
-                # Keep language as None
-                pass
+            language = next(iter(self.survey_languages), None)
         return language
 
     def add_language(self, language: str):
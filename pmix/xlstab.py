@@ -1,8 +1,110 @@
 """Module for the Xlstab class."""
+from collections import namedtuple
+
 from pmix.error import XlsformError
 from pmix.worksheet import Worksheet
 
 
+# A column in a translation pair, resolved once from the headers
+PairColumn = namedtuple('PairColumn', ['col', 'header', 'language'])
+
+
+def get_lang(header):
+    """Get the language from a header.
+
+    Args:
+        header (str): The header, e.g. 'label::English'
+
+    Returns:
+        The language found or None if '::' is not present
+    """
+    lang = None
+    if '::' in header:
+        lang = header.split('::', maxsplit=1)[1]
+    return lang
+
+
+class TranslationLayout:
+    """Which columns of a tab are translatable, and in which language.
+
+    A layout is computed from the column headers once and then answers
+    language questions without scanning the headers again. Xlstab keeps one
+    and drops it together with its cached headers.
+
+    Instance attributes:
+        headers (tuple of str): The column headers the layout is made from
+        translatable (tuple of str): The columns that can be translated in
+            this tab, e.g. Xlstab.SURVEY_TRANSLATIONS for "survey".
+        fields (dict): Maps each translatable column found in the headers
+            to a tuple of PairColumn, one per header that starts with it, in
+            order. Columns not found in the headers are left out.
+        languages (list): The sorted languages of the translatable columns.
+            None is first if present.
+        plans (dict): Computed translation plans, by (ignore, base)
+    """
+
+    def __init__(self, headers, translatable=()):
+        """Compute the layout of a tab from its headers.
+
+        Args:
+            headers (sequence of str): The column headers
+            translatable (sequence of str): The columns that can be
+                translated in the tab.
+        """
+        self.headers = tuple(headers)
+        self.translatable = tuple(translatable)
+        self.fields = {}
+        languages = set()
+        for field in self.translatable:
+            columns = tuple(PairColumn(j, header, get_lang(header)) for
+                            j, header in enumerate(self.headers) if
+                            header.startswith(field))
+            if columns:
+                self.fields[field] = columns
+                languages.update(column.language for column in columns)
+        has_none = None in languages
+        languages.discard(None)
+        self.languages = sorted(languages)
+        if has_none:
+            self.languages.insert(0, None)
+        self.plans = {}
+
+    def plan(self, ignore=None, base='English'):
+        """Get the translation plan for a base language.
+
+        See `Xlstab.translation_plan`. Plans are computed once per
+        combination of arguments.
+        """
+        key = (tuple(ignore) if ignore else (), base)
+        if key not in self.plans:
+            self.plans[key] = self.compute_plan(*key)
+        return self.plans[key]
+
+    def compute_plan(self, ignore, base):
+        """Compute a translation plan. See `Xlstab.translation_plan`."""
+        header_index = {}
+        for j, header in enumerate(self.headers):
+            header_index.setdefault(header, j)
+        ending = '::{}'.format(base)
+        plan = []
+        for col in self.headers:
+            if not col.endswith(ending):
+                continue
+            src = PairColumn(header_index[col], col, get_lang(col))
+            if src.language in ignore:
+                continue
+            start, _ = col.rsplit(sep='::', maxsplit=1)
+            others = {}
+            for header in self.headers:
+                if header.startswith(start) and header != col:
+                    language = get_lang(header)
+                    if language not in ignore:
+                        others.setdefault(header, PairColumn(
+                            header_index[header], header, language))
+            plan.append((src, tuple(others.values())))
+        return plan
+
+
 class Xlstab(Worksheet):
     """Class to represent a tab in an XLSForm, such as "survey".
 
@@ -44,6 +146,8 @@ class Xlstab(Worksheet):
             name (str): The name of the worksheet.
         """
         super().__init__(data=data, name=name)
+        self._layout = None
+        self._row_indexes = {}
         self.assert_unique_cols()
 
     def __repr__(self):
@@ -70,9 +174,7 @@ class Xlstab(Worksheet):
             is the header).
         """
         headers = self.column_headers()
-        for i, row in enumerate(self):
-            if i == 0:
-                continue
+        for row in self.body():
             json_row = {k: v for k, v in zip(headers, row)}
             yield json_row
 
@@ -80,8 +182,122 @@ class Xlstab(Worksheet):
     def from_worksheet(cls, worksheet):
         """Create an instance of Xlstab from a Worksheet instance."""
         xlstab = cls(data=worksheet.data, name=worksheet.name)
+        xlstab.set_error_index(worksheet.error_positions())
         return xlstab
 
+    def translatable_columns(self):
+        """Get the columns that can be translated in this tab.
+
+        Returns:
+            A tuple of str, empty for tabs other than "survey", "choices"
+            and "external_choices".
+        """
+        if self.name == 'survey':
+            return self.SURVEY_TRANSLATIONS
+        if self.name in ('choices', 'external_choices'):
+            return self.CHOICES_TRANSLATIONS
+        return ()
+
+    def translation_layout(self):
+        """Get the translation layout of this tab.
+
+        The layout is cached along with the column headers, so it is made
+        again after `invalidate_headers`, e.g. when a column is appended.
+
+        Returns:
+            TranslationLayout: The layout for the current headers
+        """
+        if self._layout is None:
+            self._layout = TranslationLayout(self.column_headers(),
+                                             self.translatable_columns())
+        return self._layout
+
+    def invalidate_headers(self):
+        """Clear the cached column headers, translation layout and indexes."""
+        super().invalidate_headers()
+        self._layout = None
+        self._row_indexes = {}
+
+    def copy(self):
+        """Make a copy of this tab that shares data with the original.
+
+        See `Worksheet.copy`. The row indexes are not shared.
+        """
+        result = super().copy()
+        # pylint: disable=protected-access
+        result._row_indexes = {}
+        return result
+
+    def row_index(self, header):
+        """Get a map from the text in a column to the rows that have it.
+
+        The index is built on first use and kept until the tab changes
+        through its methods (see `Worksheet.version`) or
+        `invalidate_headers` is called. The header row and blank cells are
+        left out.
+
+        Args:
+            header (str): The column header, e.g. 'name'
+
+        Returns:
+            A dictionary from cell text to a list of row indices, in order.
+            It should not be changed.
+
+        Raises:
+            KeyError: If no column has the header.
+        """
+        cached = self._row_indexes.get(header)
+        if cached is not None and cached[0] == self.version:
+            return cached[1]
+        index = {}
+        for i, text in enumerate(self.column_str(header, start=1), start=1):
+            if text:
+                index.setdefault(text, []).append(i)
+        self._row_indexes[header] = (self.version, index)
+        return index
+
+    def row_of_name(self, name):
+        """Get the first row with a given value in the "name" column.
+
+        Args:
+            name (str): The name, e.g. an ODK question name
+
+        Returns:
+            The row index, or None if no row has the name.
+        """
+        rows = self.row_index('name').get(name)
+        return rows[0] if rows else None
+
+    def rows_of_type(self, prefix):
+        """Get the rows whose "type" starts with a prefix.
+
+        Only the distinct types are compared with the prefix.
+
+        Args:
+            prefix (str): The start of the type, e.g. 'select_one' or the
+                full type 'select_one yes_no'
+
+        Returns:
+            A sorted list of row indices.
+        """
+        index = self.row_index('type')
+        found = [rows for odk_type, rows in index.items() if
+                 odk_type.startswith(prefix)]
+        if len(found) == 1:
+            return list(found[0])
+        return sorted(i for rows in found for i in rows)
+
+    def rows_of_list(self, list_name):
+        """Get the rows with a given value in the "list_name" column.
+
+        Args:
+            list_name (str): The name of the choice list
+
+        Returns:
+            A list of row indices, in order.
+        """
+        return list(self.row_index('list_name').get(list_name, ()))
+
     def add_language(self, language: str):
         """Add the used translatable columns in the given language.
 
@@ -90,16 +306,7 @@ class Xlstab(Worksheet):
         """
         if language is None:
             return
-        translate_columns = ()
-        if self.name == 'survey':
-            translate_columns = self.SURVEY_TRANSLATIONS
-        elif self.name in ('choices', 'external_choices'):
-            translate_columns = self.CHOICES_TRANSLATIONS
-        headers = self.column_headers()
-        to_translate = []
-        for col in translate_columns:
-            if any(h.startswith(col) for h in headers):
-                to_translate.append(col)
+        to_translate = list(self.translation_layout().fields)
         for col in to_translate:
             header = '{}::{}'.format(col, language)
             self.append_col(header)
@@ -124,16 +331,12 @@ class Xlstab(Worksheet):
         """
         if ignore is None:
             ignore = []
-        translate_columns = ()
-        if self.name == 'survey':
-            translate_columns = self.SURVEY_TRANSLATIONS
-        elif self.name in ('choices', 'external_choices'):
-            translate_columns = self.CHOICES_TRANSLATIONS
-        for col in translate_columns:
-            found = [h for h in self.column_headers() if h.startswith(col)]
-            keep = [h for h in found if not any(l in h for l in ignore)]
-            gen = (h for h in keep if self.get_lang(h) == base)
+        for columns in self.translation_layout().fields.values():
+            keep = [c for c in columns if
+                    not any(text in c.header for text in ignore)]
+            gen = (c.header for c in keep if c.language == base)
             base_col = next(gen, None)
+            keep = [c.header for c in keep]
             for pair in self.column_pairs(keep, base_col, start=1):
                 src, other = pair
                 src_lang = self.get_lang(src['header'])
@@ -146,7 +349,67 @@ class Xlstab(Worksheet):
                     continue
                 yield src, other
 
-    # pylint: disable=too-many-locals
+    def translation_plan(self, ignore=None, base='English'):
+        """Resolve the columns of the translation pairs in this tab.
+
+        This looks for headers of the form
+
+            [column]::[language]
+
+        where the language is the base language, and matches each with the
+        other headers that start with [column]. Columns whose language is in
+        ignore are left out.
+
+        Args:
+            ignore (seq of str): Languages to leave out. Default None keeps
+                all languages.
+            base (str): The base language. The default is 'English'.
+
+        Returns:
+            A list of (src, others) tuples, one for each base language
+            column in order, where src is a PairColumn and others a tuple of
+            PairColumn. The list is cached in the translation layout and
+            should not be changed.
+        """
+        return self.translation_layout().plan(ignore, base)
+
+    def iter_translation_pairs(self, ignore=None, base='English',
+                               complete=False):
+        """Iterate through translation pairs in this tab without allocating.
+
+        The columns are resolved once by `translation_plan`, and each pair is
+        given as a plain tuple. Pairs come in the same order as from
+        `lazy_translation_pairs`: by base column, then by row, then by other
+        column.
+
+        Args:
+            ignore (seq of str): Languages to leave out. Default None keeps
+                all languages.
+            base (str): The base language. The default is 'English'.
+            complete (bool): If true, skip pairs where either cell is blank.
+                Otherwise, only pairs where both cells are blank are skipped.
+
+        Yields:
+            A tuple (row, src_cell, other_cell, src, other), where row is the
+            row index, src_cell and other_cell the cells, and src and other
+            the PairColumn of the cells.
+        """
+        data = self.data
+        for src, others in self.translation_plan(ignore, base):
+            if not others:
+                continue
+            for i in range(1, len(data)):
+                row = data[i]
+                src_cell = row[src.col]
+                src_blank = src_cell.is_blank()
+                if complete and src_blank:
+                    continue
+                for other in others:
+                    other_cell = row[other.col]
+                    if (complete or src_blank) and other_cell.is_blank():
+                        continue
+                    yield i, src_cell, other_cell, src, other
+
     def lazy_translation_pairs(self, ignore=None, base='English'):
         """Iterate through translation pairs in this tab.
 
@@ -164,28 +427,35 @@ class Xlstab(Worksheet):
             base (str): The base language. The default is 'English'.
 
         Yields:
-            A dictionary from `Worksheet.column_pairs` plus a new key of
-            'language', the language returned from `self.get_lang`.
+            A dictionary like those from `Worksheet.column_pairs` plus a new
+            key of 'language', the language returned from `self.get_lang`.
+            See `iter_translation_pairs` for the same without dictionaries.
         """
-        if ignore is None:
-            ignore = []
-        headers = self.column_headers()
-        ending = '::{}'.format(base)
-        found = [h for h in headers if h.endswith(ending)]
-        for col in found:
-            start, _ = col.rsplit(sep='::', maxsplit=1)
-            others = [h for h in headers if h.startswith(start) and h != col]
-            for pair in self.column_pairs(others, col, start=1):
-                src, other = pair
-                src_lang = self.get_lang(src['header'])
-                src['language'] = src_lang
-                other_lang = self.get_lang(other['header'])
-                other['language'] = other_lang
-                if src_lang in ignore or other_lang in ignore:
-                    continue
-                if src['cell'].is_blank() and other['cell'].is_blank():
-                    continue
-                yield src, other
+        pairs = self.iter_translation_pairs(ignore, base)
+        for i, src_cell, other_cell, src, other in pairs:
+            yield self.pair_dict(i, src_cell, src), \
+                self.pair_dict(i, other_cell, other)
+
+    @staticmethod
+    def pair_dict(row, cell, column):
+        """Describe one cell of a translation pair as a dictionary.
+
+        Args:
+            row (int): The row index
+            cell (Cell): The cell
+            column (PairColumn): The column of the cell
+
+        Returns:
+            A dictionary with keys 'row', 'col', 'header', 'cell' and
+            'language'.
+        """
+        return {
+            'row': row,
+            'col': column.col,
+            'header': column.header,
+            'cell': cell,
+            'language': column.language
+        }
 
     def easy_translation_pairs(self, ignore=None, base='English'):
         """Iterate through translation pairs in this tab.
@@ -233,43 +503,20 @@ class Xlstab(Worksheet):
         Returns:
             The language found or None if '::' is not present
         """
-        lang = None
-        if '::' in header:
-            lang = header.split('::', maxsplit=1)[1]
-        return lang
+        return get_lang(header)
 
     def sheet_languages(self):
         """Get the sorted languages from headers.
 
-        Examines each header in the sheet and compares against a list of
-        pre-known translatable headers. If a header is translatable, then the
-        language is determined. All languages found are put in a list and
-        sorted.
+        A language is counted if a header starting with a translatable column
+        name (see `translatable_columns`) has it. The result comes from the
+        translation layout.
 
         Returns:
             A list of languages found, sorted alphabetically. None is first if
             it is found.
         """
-        translate_columns = ()
-        if self.name == 'survey':
-            translate_columns = self.SURVEY_TRANSLATIONS
-        elif self.name in ('choices', 'external_choices'):
-            translate_columns = self.CHOICES_TRANSLATIONS
-        headers = self.column_headers()
-        languages = set()
-        for header in headers:
-            for translatable in translate_columns:
-                if header.startswith(translatable):
-                    language = self.get_lang(header)
-                    languages.add(language)
-        has_none = False
-        if None in languages:
-            has_none = True
-            languages.remove(None)
-        sorted_languages = sorted(list(languages))
-        if has_none:
-            sorted_languages.insert(0, None)
-        return sorted_languages
+        return list(self.translation_layout().languages)
 
     # pylint: disable=too-many-arguments
     def merge_translations(self, translations, ignore=None, base='English',
@@ -302,34 +549,36 @@ class Xlstab(Worksheet):
             no_diverse (bool): If true, then do not translate text that has
                 multiple translations.
         """
-        for src, other in self.lazy_translation_pairs(ignore, base):
-            src_text = str(src['cell'])
+        pairs = self.iter_translation_pairs(ignore, base)
+        for i, src_cell, _, _, other in pairs:
+            src_text = str(src_cell)
             if src_text == '':
                 continue
-            other_text = str(other['cell'])
-            other_lang = other['language']
+            other_cell = self.writable_cell(i, other.col)
+            other_text = str(other_cell)
+            other_lang = other.language
             if no_diverse:
                 count_unique = translations.count_unique_translations(
                     src_text, other_lang)
                 if count_unique > 1:
-                    other['cell'].highlight = 'HL_YELLOW'
+                    other_cell.highlight = 'HL_YELLOW'
                     continue
             try:
                 translated = translations.get_numbered_translation(src_text,
                                                                    other_lang)
-                other['cell'].value = translated
+                other_cell.value = translated
                 if src_text == translated:
-                    other['cell'].highlight = 'HL_ORANGE'
+                    other_cell.highlight = 'HL_ORANGE'
                 elif translated != other_text and other_text == '':
-                    other['cell'].highlight = 'HL_GREY'
+                    other_cell.highlight = 'HL_GREY'
                 elif translated != other_text:  # and other_text != ''
-                    other['cell'].highlight = 'HL_BLUE'
+                    other_cell.highlight = 'HL_BLUE'
             except KeyError:
-                if other['cell'].is_blank():
+                if other_cell.is_blank():
                     if carry:
-                        other['cell'].value = src_text
-                        other['cell'].highlight = 'HL_ORANGE'
+                        other_cell.value = src_text
+                        other_cell.highlight = 'HL_ORANGE'
                     else:
-                        other['cell'].highlight = 'HL_RED'
+                        other_cell.highlight = 'HL_RED'
                 else:
-                    other['cell'].highlight = 'HL_GREEN'
+                    other_cell.highlight = 'HL_GREEN'
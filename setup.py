@@ -26,6 +26,7 @@ REQUIRED = [
 # What packages are optional?
 EXTRAS = {
     # 'fancy feature': ['django'],
+    'arrays': ['numpy'],
 }
 
 
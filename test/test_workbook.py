@@ -1,8 +1,21 @@
 """Tests for Workbook module."""
+import datetime
 import os.path
+import re
+import tempfile
 import unittest
+import zipfile
+from unittest import mock
 
-from pmix.workbook import Workbook
+import xlsxwriter
+
+from pmix.cache import WorkbookCache
+from pmix.error import SpreadsheetError
+from pmix.readers import XlrdReader, XlsxReader
+from pmix.workbook import SheetLoader, Workbook
+from pmix.workbook import remove_whitespace_many, write_csv_dir_many
+from pmix.worksheet import Worksheet
+from pmix.xlsform import Xlsform
 
 
 class ExcelErrorDetectionTest(unittest.TestCase):
@@ -27,3 +40,460 @@ class ExcelErrorDetectionTest(unittest.TestCase):
             found_unclean = wb.get_excel_errors()
             found = {k: dict(v) for k, v in found_unclean.items()}
             self.assertEqual(answer, found)
+
+    def test_error_index(self):
+        """Errors are indexed on load and found again after changes."""
+        path = os.path.join(self.FORM_DIR, 'error-basic.xlsx')
+        for engine in ('xlrd', 'native'):
+            sheet = Workbook(path, engine=engine)['Sheet1']
+            self.assertEqual([(0, 1), (1, 1), (2, 1)],
+                             sheet.error_positions())
+            sheet.writable_cell(1, 1).value = 'fixed'
+            self.assertEqual({'#VALUE!': ['B1'], '#NAME?': ['B3']},
+                             dict(sheet.get_excel_errors()))
+        with self.assertRaisesRegex(SpreadsheetError, '#VALUE! .* B1'):
+            Workbook(path, fail_fast=True)
+
+
+class StreamingTest(unittest.TestCase):
+    """Stream rows from an Excel file without building a Workbook."""
+
+    FORM_DIR = 'test/static'
+
+    def test_iter_rows(self):
+        """Streamed rows match the values of the loaded worksheets."""
+        for path in ('error-basic.xlsx', 'language-default-none.xlsx'):
+            full_path = os.path.join(self.FORM_DIR, path)
+            wb = Workbook(full_path)
+            for sheet in wb:
+                expected = [[cell.value for cell in row] for row in sheet]
+                found = list(Workbook.iter_rows(full_path, sheet.name))
+                msg = 'Working with "{}", "{}"'.format(path, sheet.name)
+                self.assertEqual(expected, found, msg=msg)
+
+    def test_iter_rows_missing_sheet(self):
+        """Asking for a sheet that does not exist raises an error."""
+        full_path = os.path.join(self.FORM_DIR, 'error-basic.xlsx')
+        with self.assertRaises(KeyError):
+            list(Workbook.iter_rows(full_path, 'not-a-sheet'))
+        with self.assertRaises(IndexError):
+            list(Workbook.iter_rows(full_path, 10))
+
+
+class LazyLoadingTest(unittest.TestCase):
+    """Convert sheets only when they are accessed."""
+
+    FORM_DIR = 'test/static'
+
+    def test_lazy_workbook(self):
+        """A lazy workbook converts sheets on access and matches eager."""
+        full_path = os.path.join(self.FORM_DIR, 'language-default-none.xlsx')
+        eager = Workbook(full_path)
+        lazy = Workbook(full_path, lazy=True)
+        self.assertEqual(eager.sheetnames(), lazy.sheetnames())
+        self.assertTrue(all(isinstance(s, SheetLoader) for s in lazy.data))
+        survey = lazy['survey']
+        self.assertEqual(eager['survey'].data, survey.data)
+        loaded = [not isinstance(s, SheetLoader) for s in lazy.data]
+        self.assertEqual(1, sum(loaded))
+        self.assertIs(survey, lazy['survey'])
+        for eager_sheet, lazy_sheet in zip(eager, lazy):
+            self.assertEqual(eager_sheet.data, lazy_sheet.data)
+
+    def test_lazy_close(self):
+        """The file is closed after the last sheet or on leaving a context."""
+        full_path = os.path.join(self.FORM_DIR, 'language-default-none.xlsx')
+        lazy = Workbook(full_path, lazy=True)
+        reader = lazy.data[0].reader
+        with mock.patch.object(reader, 'close', wraps=reader.close) as close:
+            lazy['survey']
+            lazy['choices']
+            close.assert_not_called()
+            lazy['settings']
+            close.assert_called_once_with()
+        with Workbook(full_path, lazy=True) as lazy:
+            reader = lazy.data[0].reader
+            lazy['survey']
+        self.assertIsNone(reader.archive.fp)
+
+
+class WorkbookCacheTest(unittest.TestCase):
+    """Reuse converted values of unchanged files from an on-disk cache."""
+
+    FORM_DIR = 'test/static'
+
+    def test_warm_load(self):
+        """A cached file is loaded without parsing and matches the source."""
+        full_path = os.path.join(self.FORM_DIR, 'language-default-none.xlsx')
+        with tempfile.TemporaryDirectory() as directory:
+            cache = WorkbookCache(directory)
+            cold = Workbook(full_path, cache=cache)
+            self.assertEqual(1, len(cache.entries()))
+            with mock.patch.object(Workbook, 'rows_from_excel') as parse:
+                warm = Workbook(full_path, cache=cache)
+                parse.assert_not_called()
+            self.assertEqual(cold.sheetnames(), warm.sheetnames())
+            for cold_sheet, warm_sheet in zip(cold, warm):
+                self.assertEqual(cold_sheet.data, warm_sheet.data)
+            Workbook(full_path, stripstr=False, cache=cache)
+            self.assertEqual(2, len(cache.entries()))
+
+    def test_bad_entry(self):
+        """A bad entry is replaced, and the file is hashed once per load."""
+        full_path = os.path.join(self.FORM_DIR, 'error-basic.xlsx')
+        with tempfile.TemporaryDirectory() as directory:
+            cache = WorkbookCache(directory)
+            key = cache.fingerprint(full_path, stripstr=True, engine='native')
+            with open(cache.entry_path(key), 'wb') as file:
+                # Unpickling this raises AttributeError
+                file.write(b'cpmix.cache\nNoSuchClass\n.')
+            with mock.patch.object(WorkbookCache, 'fingerprint',
+                                   wraps=cache.fingerprint) as fingerprint:
+                wb = Workbook(full_path, cache=cache)
+                self.assertEqual(1, fingerprint.call_count)
+            self.assertEqual(['Sheet1'], list(wb.sheetnames()))
+            self.assertIsNotNone(cache.get_entry(key))
+
+    def test_eviction(self):
+        """Least recently used entries are removed past the size limit."""
+        paths = [os.path.join(self.FORM_DIR, p) for p in
+                 ('error-basic.xlsx', 'language-default-none.xlsx')]
+        with tempfile.TemporaryDirectory() as directory:
+            cache = WorkbookCache(directory, max_size=1)
+            for path in paths:
+                Workbook(path, cache=cache)
+            self.assertEqual(0, len(cache.entries()))
+            cache.max_size = WorkbookCache.DEFAULT_MAX_SIZE
+            for path in paths:
+                Workbook(path, cache=cache)
+            self.assertEqual(2, len(cache.entries()))
+            newest = cache.entries()[-1][1]
+            cache.max_size = newest
+            cache.evict()
+            self.assertEqual(1, len(cache.entries()))
+
+
+class LoadManyTest(unittest.TestCase):
+    """Load many files in parallel."""
+
+    FORM_DIR = 'test/static'
+
+    def test_load_many(self):
+        """Results come back in order, with errors reported per file."""
+        names = ('language-default-none.xlsx', 'missing.xlsx',
+                 'error-basic.xlsx', 'language-settings-default.xlsx')
+        paths = [os.path.join(self.FORM_DIR, name) for name in names]
+        for workers in (1, 2):
+            results = Xlsform.load_many(paths, workers=workers)
+            self.assertEqual(paths, [result.path for result in results])
+            self.assertIsInstance(results[1].error, FileNotFoundError)
+            self.assertIsNone(results[1].workbook)
+            for i in (0, 2, 3):
+                self.assertIsNone(results[i].error)
+                expected = Xlsform(paths[i])
+                found = results[i].workbook
+                self.assertIsInstance(found, Xlsform)
+                self.assertEqual(expected.sheetnames(), found.sheetnames())
+                self.assertEqual(expected.settings, found.settings)
+                for sheet_a, sheet_b in zip(expected, found):
+                    self.assertEqual(sheet_a.data, sheet_b.data)
+
+    def test_load_many_intern(self):
+        """Text read in worker processes is interned in this process."""
+        paths = [os.path.join(self.FORM_DIR, 'language-default-none.xlsx')]
+        strings = {}
+        first, second = Xlsform.load_many(paths * 2, workers=2,
+                                          intern=strings)
+        self.assertEqual('type', first.workbook['survey'][0][0].value)
+        self.assertIs(first.workbook['survey'][0][0].value,
+                      second.workbook['survey'][0][0].value)
+        plain = Xlsform(paths[0])
+        for sheet in plain:
+            self.assertEqual(sheet.data, first.workbook[sheet.name].data)
+
+
+class WriteOutTest(unittest.TestCase):
+    """Write workbooks back to Excel."""
+
+    FORM_DIR = 'test/static'
+
+    def test_round_trip(self):
+        """Written values read back the same, with or without buffering."""
+        full_path = os.path.join(self.FORM_DIR, 'language-default-none.xlsx')
+        with tempfile.TemporaryDirectory() as directory:
+            for columnar in (False, True):
+                wb = Workbook(full_path, columnar=columnar)
+                survey = wb['survey']
+                survey.writable_cell(1, 1).set_highlight('HL_RED')
+                survey.writable_cell(1, survey.ncol() - 1).set_highlight()
+                for constant_memory in (False, True):
+                    out = os.path.join(directory, 'out.xlsx')
+                    wb.write_out(out, constant_memory=constant_memory)
+                    found = Workbook(out)
+                    for sheet_a, sheet_b in zip(wb, found):
+                        self.assertEqual(list(sheet_a.row_values()),
+                                         list(sheet_b.row_values()))
+
+
+class SheetIndexTest(unittest.TestCase):
+    """Find sheets by name through an index."""
+
+    FORM_DIR = 'test/static'
+
+    def test_sheet_lookup(self):
+        """Lookups follow added, removed and renamed sheets."""
+        full_path = os.path.join(self.FORM_DIR, 'language-default-none.xlsx')
+        wb = Workbook(full_path, lazy=True)
+        self.assertIn('survey', wb)
+        self.assertNotIn('missing', wb)
+        self.assertTrue(all(isinstance(s, SheetLoader) for s in wb.data))
+        self.assertIsNone(wb.get('missing'))
+        self.assertEqual('default', wb.get('missing', 'default'))
+        survey = wb.get('survey')
+        self.assertIs(survey, wb['survey'])
+        survey.name = 'renamed'
+        self.assertNotIn('survey', wb)
+        self.assertIs(survey, wb['renamed'])
+        choices = wb['choices']
+        wb.data.remove(survey)
+        self.assertIs(choices, wb['choices'])
+        with self.assertRaises(KeyError):
+            wb['renamed']
+        wb.data.insert(0, survey)
+        self.assertEqual(0, wb.sheet_position('renamed'))
+        self.assertIs(choices, wb['choices'])
+
+
+class ReaderEngineTest(unittest.TestCase):
+    """Read files through the registered reader backends."""
+
+    FORM_DIR = 'test/static'
+
+    def test_native_matches_xlrd(self):
+        """The native .xlsx reader converts cells as xlrd does."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'types.xlsx')
+            book = xlsxwriter.Workbook(path)
+            sheet = book.add_worksheet('types')
+            date_format = book.add_format({'num_format': 'yyyy-mm-dd'})
+            sheet.write_row(0, 0, ['text', ' padded ', 1, 2.5, True])
+            sheet.write_datetime(1, 0, datetime.datetime(2020, 1, 2),
+                                 date_format)
+            sheet.write_formula(1, 1, '=1/0', None, '#DIV/0!')
+            sheet.write(3, 6, 'far')
+            book.add_worksheet('empty')
+            book.close()
+            for stripstr in (True, False):
+                native = Workbook.rows_from_excel(path, stripstr)
+                xlrd_rows = Workbook.rows_from_excel(path, stripstr, 'xlrd')
+                self.assertEqual(xlrd_rows, native)
+        for filename in ('error-basic.xlsx', 'language-default-none.xlsx'):
+            full_path = os.path.join(self.FORM_DIR, filename)
+            native = Workbook(full_path, lazy=True)
+            self.assertIsInstance(native.data[0].reader, XlsxReader)
+            xlrd_book = Workbook(full_path, engine='xlrd')
+            for native_sheet, xlrd_sheet in zip(native, xlrd_book):
+                self.assertEqual(xlrd_sheet.data, native_sheet.data)
+
+    def test_native_streams_rows(self):
+        """Rows come one at a time when the <dimension> is right."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'rows.xlsx')
+            self.write_rows(path)
+            with XlsxReader(path) as reader:
+                with mock.patch.object(reader, 'parse_row',
+                                       wraps=reader.parse_row) as parse_row:
+                    rows = reader.typed_rows(0)
+                    self.assertEqual([''] * 6, next(rows)[1])
+                    self.assertEqual(6, len(next(rows)[0]))
+                    self.assertEqual(1, parse_row.call_count)
+            expected = Workbook.rows_from_excel(path, engine='xlrd')
+            self.assertEqual(expected, Workbook.rows_from_excel(path))
+
+    def test_native_wrong_dimension(self):
+        """A missing, understated or overstated <dimension> is not trusted."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'rows.xlsx')
+            self.write_rows(path)
+            expected = Workbook.rows_from_excel(path, engine='xlrd')
+            for ref in (None, 'A1', 'B2:C7', 'A1:C3', 'A1:Z40'):
+                other = os.path.join(directory, 'other.xlsx')
+                dimension = b'' if ref is None else \
+                    '<dimension ref="{}"/>'.format(ref).encode()
+                with zipfile.ZipFile(path) as source, \
+                        zipfile.ZipFile(other, 'w') as target:
+                    for info in source.infolist():
+                        data = source.read(info)
+                        if info.filename.startswith('xl/worksheets/'):
+                            data = re.sub(rb'<dimension [^>]*/>', dimension,
+                                          data)
+                        target.writestr(info, data)
+                self.assertEqual(expected, Workbook.rows_from_excel(other),
+                                 ref)
+
+    def test_native_head_strings(self):
+        """The first rows of a sheet parse only the strings they use."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'head.xlsx')
+            book = xlsxwriter.Workbook(path)
+            sheet = book.add_worksheet('head')
+            for rowx in range(1, 50):
+                sheet.write(rowx, 0, 'text {}'.format(rowx))
+            bold = book.add_format({'bold': True})
+            sheet.write_rich_string(0, 0, 'rich ', bold, 'text')
+            sheet.write(0, 1, 'text 49')
+            book.close()
+            expected = Workbook.rows_from_excel(path, engine='xlrd')[0][1]
+            with XlsxReader(path) as reader:
+                self.assertEqual(expected[:2], reader.head(0, 2))
+                # pylint: disable=protected-access
+                self.assertIsNone(reader._shared_strings)
+                self.assertEqual(expected, list(reader.rows(0)))
+
+    @staticmethod
+    def write_rows(path):
+        """Write a sheet of 6 columns that starts with an empty row."""
+        book = xlsxwriter.Workbook(path)
+        sheet = book.add_worksheet('rows')
+        sheet.write_row(1, 1, ['a', 'b', 'c', 'd', 'e'])
+        for rowx in range(3, 20, 2):
+            sheet.write(rowx, rowx % 6, rowx)
+        book.close()
+
+    def test_engine_selection(self):
+        """Unknown extensions and engines are refused."""
+        with self.assertRaises(TypeError):
+            Workbook('form.ods')
+        with self.assertRaises(KeyError):
+            Workbook('form.xlsx', engine='missing')
+        self.assertEqual(('xlrd', XlrdReader), Workbook.reader_for('form.xls'))
+
+
+class CsvInputTest(unittest.TestCase):
+    """Load workbooks from CSV files."""
+
+    FORM_DIR = 'test/static'
+
+    def test_csv_directory(self):
+        """A directory of CSV files loads like the Excel file it came from."""
+        full_path = os.path.join(self.FORM_DIR, 'language-default-none.xlsx')
+        excel = Xlsform(full_path)
+        with tempfile.TemporaryDirectory() as directory:
+            for sheet in excel:
+                sheet.to_csv(os.path.join(directory, sheet.name + '.csv'))
+            from_csv = Xlsform(directory)
+            self.assertEqual(sorted(excel.sheetnames()),
+                             list(from_csv.sheetnames()))
+            for sheet in excel:
+                self.assertEqual(sheet.data, from_csv[sheet.name].data)
+            tsv_path = os.path.join(directory, 'numbers.tsv')
+            with open(tsv_path, 'w', encoding='utf-8') as file:
+                file.write('3\t2.5\t007\t1.50\t1e3\t nan\t\n\t \t\t\t\t\t\n\n')
+            rows = list(Workbook.iter_rows(tsv_path, stripstr=False))
+        self.assertEqual([[3, 2.5, '007', '1.50', '1e3', ' nan'],
+                          [None, ' ', None, None, None, None]], rows)
+
+
+class SnapshotTest(unittest.TestCase):
+    """Save workbooks to snapshots and load them back."""
+
+    FORM_DIR = 'test/static'
+
+    def test_snapshot_round_trip(self):
+        """Values, highlights and sheet names survive a snapshot."""
+        full_path = os.path.join(self.FORM_DIR, 'language-default-none.xlsx')
+        xlsform = Xlsform(full_path)
+        xlsform['survey'].writable_cell(1, 1).set_highlight('HL_GREEN')
+        values = [[1.5, True, -(2 ** 70), datetime.date(2020, 1, 2)],
+                  [datetime.datetime(2020, 1, 2, 3, 4, 5, 6),
+                   datetime.time(7, 8), 'text', None]]
+        xlsform.data.append(Worksheet.from_rows(values, 'values'))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'form.pmix')
+            xlsform.write_out(path)
+            for columnar in (False, True):
+                loaded = Xlsform.load_snapshot(path, columnar=columnar)
+                self.assertIsInstance(loaded, Xlsform)
+                self.assertEqual(xlsform.sheetnames(), loaded.sheetnames())
+                for sheet in xlsform:
+                    self.assertEqual(list(sheet.row_values()),
+                                     list(loaded[sheet.name].row_values()))
+                self.assertEqual('HL_GREEN', loaded['survey'][1][1].highlight)
+                self.assertEqual(xlsform.settings, loaded.settings)
+            with open(path, 'r+b') as file:
+                file.write(b'NOTASNAP')
+            with self.assertRaises(ValueError):
+                Workbook(path)
+
+    def test_snapshot_rows_without_columns(self):
+        """Sheets whose rows have no cells keep their row count."""
+        workbook = Workbook(os.path.join(self.FORM_DIR, 'error-basic.xlsx'))
+        for columnar in (False, True):
+            workbook.data = [Worksheet.from_rows([[], []], 'blank',
+                                                 columnar=columnar)]
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'blank.pmix')
+                workbook.save_snapshot(path)
+                for load_columnar in (False, True):
+                    loaded = Workbook.load_snapshot(path,
+                                                    columnar=load_columnar)
+                    self.assertEqual(2, len(loaded['blank']))
+
+
+class CsvDirTest(unittest.TestCase):
+    """Export all sheets of a workbook to CSV."""
+
+    FORM_DIR = 'test/static'
+
+    def test_to_csv_dir(self):
+        """Every sheet is written and reads back the same."""
+        full_path = os.path.join(self.FORM_DIR, 'language-default-none.xlsx')
+        xlsform = Xlsform(full_path, lazy=True)
+        with tempfile.TemporaryDirectory() as directory:
+            outdir = os.path.join(directory, 'csv')
+            paths = xlsform.to_csv_dir(outdir)
+            self.assertEqual([os.path.join(outdir, name + '.csv') for name in
+                              xlsform.sheetnames()], paths)
+            exported = Workbook(outdir)
+            for sheet in xlsform:
+                self.assertEqual(sheet.data, exported[sheet.name].data)
+
+    def test_write_csv_dir_many(self):
+        """Several workbooks are written, each to its own directory."""
+        names = ('language-default-none.xlsx',
+                 'language-missing-default.xlsx')
+        with tempfile.TemporaryDirectory() as directory:
+            jobs = [(os.path.join(self.FORM_DIR, name),
+                     os.path.join(directory, name[:-5])) for name in names]
+            results = list(write_csv_dir_many(jobs, workers=2))
+            for (inpath, outdir), paths in zip(jobs, results):
+                workbook = Workbook(inpath)
+                self.assertEqual([os.path.join(outdir, name + '.csv') for
+                                  name in workbook.sheetnames()], paths)
+                exported = Workbook(outdir)
+                for sheet in workbook:
+                    self.assertEqual(sheet.data, exported[sheet.name].data)
+
+
+class WhitespaceCleaningTest(unittest.TestCase):
+    """Clean the whitespace of text while streaming a workbook."""
+
+    def test_remove_whitespace_many(self):
+        """Files are cleaned and changes are counted by sheet and column."""
+        with tempfile.TemporaryDirectory() as directory:
+            jobs = []
+            for name in ('a', 'b'):
+                inpath = os.path.join(directory, name + '.xlsx')
+                wb = xlsxwriter.Workbook(inpath)
+                ws = wb.add_worksheet('survey')
+                ws.write_row(0, 0, ['type', ' name', 'label'])
+                ws.write_row(1, 0, ['text', 'x\r\n', 'a  b'])
+                ws.write_row(2, 0, [1, 'y', 'ok'])
+                wb.close()
+                outpath = os.path.join(directory, name + '-out.xlsx')
+                jobs.append((inpath, outpath))
+            summaries = list(remove_whitespace_many(jobs, workers=2))
+            self.assertEqual([{'survey': {'B': 2, 'C': 1}}] * 2, summaries)
+            cleaned = Workbook(jobs[0][1], stripstr=False)['survey']
+            self.assertEqual([['type', 'name', 'label'], ['text', 'x', 'a b'],
+                              [1, 'y', 'ok']], list(cleaned.row_values()))
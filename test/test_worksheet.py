@@ -0,0 +1,288 @@
+"""Tests for Worksheet module."""
+import os.path
+import sys
+import unittest
+from unittest import mock
+
+import xlrd
+
+try:
+    import numpy
+except ImportError:
+    # pylint: disable=invalid-name
+    numpy = None
+
+from pmix.cell import BLANK, Cell
+from pmix.columnstore import ColumnStore
+from pmix.workbook import Workbook
+from pmix.xlsdiff import XlsDiff
+from pmix.worksheet import Worksheet
+from pmix.xlsform import Xlsform
+
+
+class ColumnarWorksheetTest(unittest.TestCase):
+    """Store worksheet data column by column."""
+
+    FORM_DIR = 'test/static'
+
+    def test_columnar_matches_rows(self):
+        """A columnar workbook has the same values as the default one."""
+        full_path = os.path.join(self.FORM_DIR, 'language-default-none.xlsx')
+        rows = Workbook(full_path)
+        columns = Workbook(full_path, columnar=True)
+        for row_sheet, col_sheet in zip(rows, columns):
+            self.assertTrue(col_sheet.is_columnar())
+            self.assertEqual(row_sheet.dim(), col_sheet.dim())
+            self.assertEqual(list(row_sheet.row_values()),
+                             list(col_sheet.row_values()))
+            for header in row_sheet.column_headers():
+                if not header:
+                    continue
+                self.assertEqual(row_sheet.column_values(header),
+                                 col_sheet.column_values(header))
+                self.assertEqual(list(row_sheet.column_str(header, 1)),
+                                 list(col_sheet.column_str(header, 1)))
+
+    def test_columnar_xlsform_language(self):
+        """An Xlsform with columnar sheets finds its languages."""
+        full_path = os.path.join(self.FORM_DIR,
+                                 'language-missing-default.xlsx')
+        xlsform = Xlsform(full_path, columnar=True)
+        self.assertEqual('Dioula', xlsform.form_language)
+
+    def test_write_through(self):
+        """Cells from a columnar worksheet write back into the columns."""
+        ws = Worksheet(data=[['a', 'b'], [1, 2], [3, None]], name='test',
+                       columnar=True)
+        self.assertIsInstance(ws.data, ColumnStore)
+        cell = ws[2][1]
+        cell.value = 'new'
+        cell.set_highlight('HL_RED')
+        self.assertEqual(['b', 2, 'new'], ws.column_values('b'))
+        self.assertEqual({(2, 1): 'HL_RED'}, ws.data.highlights)
+        ws.append_col('c')
+        self.assertEqual(['c', None, None], ws.column_values('c'))
+        ws.prepend_row()
+        self.assertEqual((4, 3), ws.dim())
+        self.assertEqual('HL_RED', ws[3][1].highlight)
+        self.assertEqual([None, 'b', 2, 'new'], ws.column_values(1))
+
+    def test_empty_first_row(self):
+        """An empty first row does not fix the width of the store."""
+        store = ColumnStore.from_rows([[], ['a', 'b'], [1, 2]])
+        self.assertEqual([[None, 'a', 1], [None, 'b', 2]], store.columns)
+        self.assertEqual(3, len(store))
+
+
+class SharedBlankCellTest(unittest.TestCase):
+    """Blank cells share one read-only instance until written."""
+
+    FORM_DIR = 'test/static'
+
+    def test_blank_cells_shared(self):
+        """Blank cells from file and new columns are the BLANK cell."""
+        full_path = os.path.join(self.FORM_DIR, 'language-default-none.xlsx')
+        survey = Workbook(full_path)['survey']
+        blanks = [cell for cell in survey.cell_iter() if cell.value is None]
+        self.assertTrue(blanks)
+        self.assertTrue(all(cell is BLANK for cell in blanks))
+        survey.append_col('label::Swahili')
+        self.assertTrue(all(cell is BLANK for cell in
+                            survey.column('label::Swahili', start=1)))
+
+    def test_writable_cell(self):
+        """Blank cells are read-only until replaced by writable_cell."""
+        ws = Worksheet(data=[[Cell('a'), BLANK], [BLANK, BLANK]])
+        with self.assertRaises(AttributeError):
+            ws[1][1].value = 'x'
+        cell = ws.writable_cell(1, 1)
+        cell.value = 'x'
+        cell.set_highlight()
+        self.assertIsNot(BLANK, ws[1][1])
+        self.assertEqual('x', str(ws[1][1]))
+        self.assertIs(BLANK, ws[1][0])
+        self.assertIsNone(BLANK.value)
+        self.assertIsNone(BLANK.highlight)
+        self.assertFalse(hasattr(Cell('a'), '__dict__'))
+
+
+class CopyOnWriteTest(unittest.TestCase):
+    """Copies share rows and cells until they are written."""
+
+    def test_copy_shares_until_write(self):
+        """Writing to either copy does not show in the other."""
+        ws = Worksheet(data=[[Cell('a'), Cell('b')], [Cell(1), BLANK],
+                             [Cell(3), Cell(4)]], name='test')
+        other = ws.copy()
+        self.assertIsNot(ws.data, other.data)
+        self.assertTrue(all(a is b for a, b in zip(ws.data, other.data)))
+        cell = other.writable_cell(1, 0)
+        cell.value = 'changed'
+        cell.set_highlight()
+        other.writable_cell(1, 1).value = 'filled'
+        self.assertEqual([[1, None]], list(ws.row_values())[1:2])
+        self.assertIsNone(ws[1][0].highlight)
+        self.assertEqual(['changed', 'filled'], list(other.row_values())[1])
+        self.assertIs(ws[2], other[2])
+        ws.writable_cell(2, 1).value = 5
+        self.assertEqual(4, other[2][1].value)
+        self.assertIs(ws[2][0], other[2][0])
+        other.prepend_row()
+        other.append_col('c')
+        self.assertEqual((3, 2), ws.dim())
+        self.assertEqual((4, 3), other.dim())
+        other.writable_cell(3, 0).value = 'again'
+        self.assertEqual(3, ws[2][0].value)
+
+    def test_workbook_copy(self):
+        """A workbook copy shares data with the original until written."""
+        full_path = os.path.join('test/static', 'language-default-none.xlsx')
+        wb = Workbook(full_path)
+        wb_copy = wb.copy()
+        self.assertIs(wb['survey'][1], wb_copy['survey'][1])
+        for cell in wb_copy['survey'].writable_row(1):
+            cell.set_highlight()
+        self.assertFalse(any(cell.highlight for cell in wb.cell_iter()))
+        self.assertTrue(all(cell.highlight for cell in wb_copy['survey'][1]))
+
+
+class HeaderCacheTest(unittest.TestCase):
+    """Column headers are cached until the header row changes."""
+
+    def test_header_cache(self):
+        """The cached headers follow header edits and new columns."""
+        ws = Worksheet(data=[[Cell('a'), BLANK, Cell('a')],
+                             [Cell(1), Cell(2), Cell(3)]], name='test')
+        self.assertEqual(('a', '', 'a'), ws.column_headers())
+        self.assertIs(ws.column_headers(), ws.column_headers())
+        self.assertEqual([0], ws.column_key('a'))
+        with self.assertRaises(KeyError):
+            ws.column_key('b')
+        ws.writable_cell(0, 1).value = 'b'
+        self.assertEqual([1], ws.column_key('b'))
+        ws.append_col('c')
+        self.assertEqual(('a', 'b', 'a', 'c'), ws.column_headers())
+        self.assertEqual([None], ws.column_values('c', start=1))
+        ws.prepend_row()
+        self.assertEqual(('', '', '', ''), ws.column_headers())
+        with self.assertRaises(KeyError):
+            ws.column_key('c')
+
+    def test_column_pairs(self):
+        """Pairs look headers up in the cached header index."""
+        ws = Worksheet.from_rows([['a', 'b', 'c'], [1, 2, 3], [4, 5, 6]])
+        with mock.patch.object(ws, 'header_index',
+                               wraps=ws.header_index) as header_index:
+            pairs = list(ws.column_pairs(['c', 0, 'c'], base='a', start=1))
+            self.assertTrue(header_index.called)
+        self.assertEqual([(1, 3), (4, 6)],
+                         [(base['cell'].value, other['cell'].value) for
+                          base, other in pairs])
+        self.assertEqual(('a', 'c'), (pairs[0][0]['header'],
+                                      pairs[0][1]['header']))
+        with self.assertRaises(KeyError):
+            list(ws.column_pairs(['d']))
+
+
+class BulkConversionTest(unittest.TestCase):
+    """Convert xlrd cells a row at a time."""
+
+    def test_convert_values_matches_cell_value(self):
+        """Bulk conversion agrees with converting each cell."""
+        types = [xlrd.XL_CELL_TEXT, xlrd.XL_CELL_TEXT, xlrd.XL_CELL_NUMBER,
+                 xlrd.XL_CELL_NUMBER, xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BOOLEAN,
+                 xlrd.XL_CELL_DATE, xlrd.XL_CELL_ERROR, xlrd.XL_CELL_TEXT]
+        values = [' a ', 'b', 1.0, 1.5, '', 1, 43000.5, 7, 'c ']
+        cells = [xlrd.sheet.Cell(ctype, value) for ctype, value in
+                 zip(types, values)]
+        for stripstr in (True, False):
+            expected = [Cell.cell_value(cell, 0, stripstr) for cell in cells]
+            found = Cell.convert_values(types, values, 0, stripstr)
+            self.assertEqual(expected, found)
+        self.assertEqual([None, None], Cell.convert_values([0, 0], ['', '']))
+        with self.assertRaises(TypeError):
+            Cell.convert_values([xlrd.XL_CELL_TEXT, 99], ['a', 'b'])
+
+
+class InternTest(unittest.TestCase):
+    """Share equal text values between cells."""
+
+    FORM_DIR = 'test/static'
+
+    def test_intern_table(self):
+        """Workbooks loaded with the same table share their strings."""
+        full_path = os.path.join(self.FORM_DIR, 'language-default-none.xlsx')
+        strings = {}
+        first = Workbook(full_path, intern=strings)
+        second = Workbook(full_path, lazy=True, intern=strings)
+        plain = Workbook(full_path)
+        self.assertTrue(strings)
+        for first_sheet, second_sheet, plain_sheet in zip(first, second,
+                                                          plain):
+            self.assertEqual(plain_sheet.data, first_sheet.data)
+            for cell_a, cell_b in zip(first_sheet.cell_iter(),
+                                      second_sheet.cell_iter()):
+                self.assertIs(cell_a.value, cell_b.value)
+        rows = [[''.join(['a', 'b']), 1], [''.join(['a', 'b']), None]]
+        worksheet = Worksheet.from_rows(rows, intern=True)
+        self.assertIs(worksheet[0][0].value, worksheet[1][0].value)
+
+    def test_xlsdiff_interned(self):
+        """A diff of interned files is the same as one without interning."""
+        base = os.path.join(self.FORM_DIR, 'language-default-none.xlsx')
+        new = os.path.join(self.FORM_DIR, 'language-settings-default.xlsx')
+        interned = XlsDiff.from_file(base, new, False)
+        plain = XlsDiff(Workbook(base, stripstr=False),
+                        Workbook(new, stripstr=False), False)
+        self.assertEqual(plain.col_venn, interned.col_venn)
+        self.assertEqual(plain.row_venn, interned.row_venn)
+        self.assertEqual(plain.report_overview(), interned.report_overview())
+        self.assertEqual(1, len(interned.cell_diff['settings']))
+
+
+class WorksheetViewTest(unittest.TestCase):
+    """View rows and columns of a worksheet without copying."""
+
+    def test_views(self):
+        """Views index, iterate and nest over the parent data."""
+        rows = [['name', 'label', 'hint'], ['a', 'A', 'x'], ['b', 'B', 'y'],
+                ['c', 'C', 'z']]
+        worksheet = Worksheet.from_rows(rows, 'survey')
+        body = worksheet.body()
+        self.assertEqual(3, len(body))
+        self.assertIs(worksheet[1], body[0])
+        labels = worksheet.view(rows=slice(1, 3), cols=['label', 0])
+        self.assertEqual([['A', 'a'], ['B', 'b']],
+                         [[cell.value for cell in row] for row in labels])
+        self.assertEqual([2], [i for i, _ in labels[1:].items()])
+        nested = body.view(rows=slice(2, None), cols=['hint'])
+        self.assertEqual(1, nested.ncol())
+        worksheet.writable_cell(3, 2).value = 'changed'
+        self.assertEqual('changed', nested[0][0].value)
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class ColumnArrayTest(unittest.TestCase):
+    """Get columns as NumPy masked arrays."""
+
+    def test_column_arrays(self):
+        """Blanks are masked and values converted to the dtype."""
+        rows = [['count', 'label', 'note'], [1, 'yes', None], [None, '', 'x'],
+                [3, 'no', 'y']]
+        worksheet = Worksheet.from_rows(rows, 'choices')
+        counts = worksheet.column_array('count', dtype=float)
+        self.assertEqual([False, True, False], list(counts.mask))
+        self.assertEqual(4.0, counts.sum())
+        labels = worksheet.column_array('label', dtype=str)
+        self.assertEqual([3, 0, 2], list(numpy.char.str_len(labels.data)))
+        objects = worksheet.column_array(2)
+        self.assertEqual([None, 'x', 'y'], list(objects.data))
+        self.assertEqual(['label', 'yes'],
+                         list(worksheet.column_array('label', start=0)[:2]))
+
+    def test_numpy_missing(self):
+        """Without NumPy, only the array methods fail."""
+        worksheet = Worksheet.from_rows([['count'], [1]], 'choices')
+        with mock.patch.dict(sys.modules, {'numpy': None}):
+            with self.assertRaisesRegex(ImportError, 'column_array'):
+                worksheet.column_array('count')
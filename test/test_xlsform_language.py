@@ -1,7 +1,13 @@
 """Tests for Xlsform module."""
 import os
+import tempfile
 import unittest
+
+import xlsxwriter
+
+from pmix.worksheet import Worksheet
 from pmix.xlsform import Xlsform
+from pmix.xlstab import PairColumn, Xlstab
 
 
 class XlsFormLanguageTest(unittest.TestCase):
@@ -21,6 +27,51 @@ class XlsFormLanguageTest(unittest.TestCase):
             found = xlsform.form_language
             msg = 'Working with "{}"'.format(path)
             self.assertEqual(language, found, msg=msg)
+            lazy_xlsform = Xlsform(form_path, lazy=True)
+            self.assertEqual(language, lazy_xlsform.form_language, msg=msg)
+
+    def test_probe(self):
+        """Probing gives the metadata of a fully loaded form."""
+        paths = [os.path.join(self.FORM_DIR, name) for name in (
+            'language-default-none.xlsx', 'language-missing-default.xlsx',
+            'language-settings-default.xlsx', 'missing.xlsx')]
+        probes = list(Xlsform.probe_many(paths, workers=2))
+        self.assertEqual(paths, [probe.path for probe in probes])
+        for path, probe in zip(paths[:-1], probes):
+            xlsform = Xlsform(path)
+            self.assertIsNone(probe.error)
+            self.assertEqual(xlsform.sheetnames(), probe.sheetnames)
+            self.assertEqual(xlsform.metadata(), probe.metadata)
+            self.assertEqual(probe, Xlsform.probe(path, engine='xlrd'))
+        self.assertIsInstance(probes[-1].error, OSError)
+
+    def test_no_language(self):
+        """A form without any language has a form language of None."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'form.xlsx')
+            book = xlsxwriter.Workbook(path)
+            book.add_worksheet('survey').write_row(0, 0, ['type', 'name'])
+            book.add_worksheet('settings').write_row(0, 0, ['form_id'])
+            book.close()
+            metadata = Xlsform(path).metadata()
+            self.assertIsNone(metadata.form_language)
+            self.assertEqual(Xlsform.probe(path).metadata, metadata)
+
+    def test_settings_cache(self):
+        """Settings are read once and again after the tab changes."""
+        form_path = os.path.join(self.FORM_DIR,
+                                 'language-settings-default.xlsx')
+        xlsform = Xlsform(form_path)
+        settings = xlsform.settings
+        self.assertEqual('FRS-bfr2-v9', xlsform.form_id)
+        self.assertIs(settings, xlsform.settings)
+        col = xlsform['settings'].column_key('default_language')[0]
+        xlsform['settings'].writable_cell(1, col).value = 'Moore'
+        metadata = xlsform.metadata()
+        self.assertIsNot(settings, xlsform.settings)
+        self.assertEqual(('FRS-bfr2-v9', 'Moore', 'Moore', None),
+                         (metadata.form_id, metadata.settings_language,
+                          metadata.form_language, metadata.version))
 
     def test_sheet_language(self):
         """Languages found in a sheet are correctly determined."""
@@ -42,3 +93,80 @@ class XlsFormLanguageTest(unittest.TestCase):
                 expected = answer[name]
                 msg = 'Testing file "{}" and sheet "{}"'.format(path, name)
                 self.assertEqual(expected, found, msg=msg)
+
+
+class TranslationPairTest(unittest.TestCase):
+    """Unit tests for the translation pairs of an Xlstab."""
+
+    FORM_DIR = 'test/static'
+
+    def test_translation_plan(self):
+        """Columns are resolved once and pairs match the dictionary form."""
+        form_path = os.path.join(self.FORM_DIR, 'language-default-none.xlsx')
+        xlsform = Xlsform(form_path)
+        plan = xlsform['survey'].translation_plan(ignore=['Moore', 'Dioula'])
+        self.assertEqual([
+            (PairColumn(12, 'image::English', 'English'), (
+                PairColumn(32, 'image::French', 'French'),
+                PairColumn(34, 'image::Gourmantchema', 'Gourmantchema'),
+                PairColumn(35, 'image::Fulfulde', 'Fulfulde'))),
+            (PairColumn(13, 'audio::English', 'English'), ()),
+        ], plan)
+        for xlstab in xlsform:
+            pairs = [(xlstab.pair_dict(i, src_cell, src),
+                      xlstab.pair_dict(i, other_cell, other)) for
+                     i, src_cell, other_cell, src, other in
+                     xlstab.iter_translation_pairs()]
+            self.assertEqual(list(xlstab.lazy_translation_pairs()), pairs)
+        choices = list(xlsform['choices'].iter_translation_pairs())
+        self.assertEqual((1, 'OK', 'OK', 'French'),
+                         (choices[0][0], choices[0][1].value,
+                          choices[0][2].value, choices[0][4].language))
+
+    def test_translation_layout(self):
+        """The layout is cached and made again when a column is added."""
+        form_path = os.path.join(self.FORM_DIR, 'language-default-none.xlsx')
+        xlsform = Xlsform(form_path)
+        choices = xlsform['choices']
+        layout = choices.translation_layout()
+        self.assertIs(layout, choices.translation_layout())
+        self.assertIs(layout.plan(), choices.translation_plan())
+        self.assertEqual(['label'], list(layout.fields))
+        xlsform.add_language('Spanish')
+        self.assertIsNot(layout, choices.translation_layout())
+        self.assertEqual(['English', 'French', 'Spanish'],
+                         choices.sheet_languages())
+        self.assertEqual(
+            (PairColumn(4, 'label::Spanish', 'Spanish'),),
+            choices.translation_plan()[0][1][1:])
+
+
+class RowIndexTest(unittest.TestCase):
+    """Unit tests for the row indexes of an Xlstab."""
+
+    def test_row_index(self):
+        """Rows are found by name and type, and indexes follow changes."""
+        worksheet = Worksheet.from_rows([
+            ['type', 'name', 'list_name'],
+            ['select_one yn', 'q1', None],
+            ['text', 'q2', None],
+            ['select_one yn', 'q3', 'x'],
+            ['select_multiple yn', 'q1', None],
+        ], name='survey')
+        survey = Xlstab.from_worksheet(worksheet)
+        self.assertEqual(1, survey.row_of_name('q1'))
+        self.assertIsNone(survey.row_of_name('q4'))
+        self.assertEqual([1, 3, 4], survey.rows_of_type('select_'))
+        self.assertEqual([1, 3], survey.rows_of_type('select_one yn'))
+        self.assertEqual([3], survey.rows_of_list('x'))
+        index = survey.row_index('name')
+        self.assertIs(index, survey.row_index('name'))
+        copy = survey.copy()
+        copy.writable_cell(2, 1).value = 'q4'
+        self.assertEqual(2, copy.row_of_name('q4'))
+        self.assertIsNone(survey.row_of_name('q4'))
+        self.assertIs(index, survey.row_index('name'))
+        survey.writable_cell(2, 0).value = 'select_one yn'
+        self.assertEqual([1, 2, 3], survey.rows_of_type('select_one'))
+        with self.assertRaises(KeyError):
+            survey.row_index('label')